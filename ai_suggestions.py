@@ -1,18 +1,155 @@
 import os
-from openai import OpenAI
+import asyncio
+import random
+import time
+import httpx
+from openai import (
+    OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient,
+    RateLimitError, APIConnectionError, InternalServerError
+)
 import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+# orjson is an optional speedup for parsing responses
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Get API key from environment
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 
-# Only initialize the OpenAI client if we have an API key
-openai = None
-if OPENAI_API_KEY:
-    try:
-        from openai import OpenAI
-        openai = OpenAI(api_key=OPENAI_API_KEY)
-    except Exception as e:
-        print(f"Error initializing OpenAI: {e}")
+# Connection pool sizing for the OpenAI HTTP transport. The SDK defaults cap
+# keep-alive connections well below what concurrent batches need.
+HTTP_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=50)
+HTTP_TIMEOUT = 30.0
+
+# Retry policy for transient OpenAI failures (rate limits, network, 5xx).
+# Exponential backoff with full jitter, capped at RETRY_MAX_DELAY seconds.
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+# Only initialize the OpenAI client (and its connection pool) if we have an API key
+# Retries are handled by _with_retries, which never retries quota errors
+openai = OpenAI(
+    api_key=OPENAI_API_KEY,
+    max_retries=0,
+    http_client=DefaultHttpxClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+) if OPENAI_API_KEY else None
+
+# Fields every suggestion must contain
+SUGGESTION_FIELDS = """1. action: A clear directional recommendation using terms like "STRONG LONG", "LONG", "WEAK LONG", "NEUTRAL", "WEAK SHORT", "SHORT", or "STRONG SHORT"
+    2. rationale: A brief explanation of the recommendation (2-3 sentences)
+    3. entry_point: A suggested entry price
+    4. stop_loss: A suggested stop loss price
+    5. take_profit: A suggested take profit price
+    6. strength: A confidence percentage (0-100) indicating the strength of the signal"""
+
+# Prompt templates, filled per call with format_map. Static instructions come
+# first and the chart data last, so the leading tokens are byte-identical
+# across requests and hit OpenAI's prompt cache.
+PROMPT_TEMPLATE = """
+    Based on the stock chart analysis below, provide a trading suggestion in JSON format with the following fields:
+    {suggestion_fields}
+    
+    Your suggestion should be fair, unbiased, and based solely on the technical analysis provided.
+    
+    Timeframe: {timeframe}
+    
+    {analysis}
+    """
+
+ANALYSIS_TEMPLATE = """Detected Patterns:
+    {patterns_text}
+    
+    Technical Indicators:
+    {ma_text}
+    {osc_text}
+    {sr_text}"""
+
+# Keep the system message verbatim so it stays part of the cached prefix
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are an expert technical analyst who provides unbiased trading suggestions based on chart analysis."
+}
+
+# Structured-output schema for one suggestion. Strict mode guarantees every
+# field is present and typed; numeric bounds aren't supported there, so
+# strength is clamped after parsing instead.
+SUGGESTION_ACTIONS = ["STRONG LONG", "LONG", "WEAK LONG", "NEUTRAL", "WEAK SHORT", "SHORT", "STRONG SHORT"]
+SUGGESTION_SCHEMA = {
+    "name": "trading_suggestion",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "action": {"type": "string", "enum": SUGGESTION_ACTIONS},
+            "rationale": {"type": "string"},
+            "entry_point": {"type": "number"},
+            "stop_loss": {"type": "number"},
+            "take_profit": {"type": "number"},
+            "strength": {"type": "integer"}
+        },
+        "required": ["action", "rationale", "entry_point", "stop_loss", "take_profit", "strength"],
+        "additionalProperties": False
+    }
+}
+
+# Output token budget for one suggestion; the JSON is typically well under 200 tokens
+SUGGESTION_MAX_TOKENS = 220
+
+# Signed weight of each indicator reading in the rule-based score
+MA_TREND_SCORES = {"Bullish": 1, "Bearish": -1}
+RSI_TREND_SCORES = {"Oversold": 2, "Overbought": -2}
+MACD_TREND_SCORES = {"Bullish": 2, "Bearish": -2}
+STOCHASTIC_TREND_SCORES = {"Oversold": 1, "Overbought": -1}
+
+# Pattern-name rules for the rule-based score, checked in order (first match wins)
+PATTERN_RULES = [
+    (re.compile(r"Uptrend|Bullish|Double Bottom"), 2),
+    (re.compile(r"Downtrend|Bearish|Double Top|Head and Shoulders"), -2),
+    (re.compile(r"^(?=.*Triangle).*Ascending"), 1),
+    (re.compile(r"^(?=.*Triangle).*Descending"), -1),
+]
+
+# Rule-based actions as (signal_diff lower bound, action, direction, rationale),
+# checked in order; direction is 1 for long, -1 for short and 0 for neutral.
+RULE_ACTIONS = [
+    (4, "STRONG LONG", 1, "Multiple bullish indicators and patterns suggest strong upward momentum on the {timeframe} timeframe. Moving averages are aligned bullishly with positive oscillator readings."),
+    (2, "LONG", 1, "Bullish signals outweigh bearish ones on the {timeframe} timeframe. Technical indicators suggest potential upward movement with moderate strength."),
+    (0, "WEAK LONG", 1, "Slightly bullish signals on the {timeframe} timeframe, but caution is advised. Some indicators show positive momentum, but conviction is not strong."),
+    (-2, "WEAK SHORT", -1, "Slightly bearish signals on the {timeframe} timeframe. Some indicators show negative momentum, but conviction is not strong."),
+    (-4, "SHORT", -1, "Bearish signals outweigh bullish ones on the {timeframe} timeframe. Technical indicators suggest potential downward movement with moderate strength."),
+    (float("-inf"), "STRONG SHORT", -1, "Multiple bearish indicators and patterns suggest strong downward momentum on the {timeframe} timeframe. Moving averages are aligned bearishly with negative oscillator readings."),
+]
+NEUTRAL_ACTION = ("NEUTRAL", 0, "Mixed signals on the {timeframe} timeframe suggest a sideways market. Equal bullish and bearish pressure indicates no clear direction at this time.")
+
+# Stop loss / take profit placement per direction: (stop level, multiplier, target level, multiplier)
+LEVEL_MULTIPLIERS = {
+    1: ("support", 0.99, "resistance", 1.01),       # Long: just below support / just above resistance
+    -1: ("resistance", 1.01, "support", 0.99),      # Short: just above resistance / just below support
+    0: ("support", 0.98, "resistance", 1.02)        # Neutral: further out either side
+}
+
+@dataclass(slots=True)
+class AnalysisView:
+    """
+    Flattened view of one analysis, built once by _to_view and shared by the
+    OpenAI prompt and the rule-based fallback
+    """
+    patterns: list
+    moving_averages: dict
+    rsi: dict
+    macd: dict
+    stochastic: dict
+    support: list
+    resistance: list
+    analysis_text: str
+    signal_diff: float
 
 def get_trading_suggestion(analysis_results, timeframe):
     """
@@ -23,26 +160,78 @@ def get_trading_suggestion(analysis_results, timeframe):
         timeframe (str): The timeframe of the chart
         
     Returns:
-        dict: A trading suggestion including action, rationale, and key levels
+        dict: A trading suggestion including action, rationale, and key levels;
+            a rule-based stand-in for a failed OpenAI request also has
+            "fallback": True
     """
     # Fall back to rule-based suggestions if OpenAI API key is not available
     if not OPENAI_API_KEY:
         return generate_rule_based_suggestion(analysis_results, timeframe)
     
+    # Canonicalize once; the view serves both the prompt and the fallback score
+    view = _to_view(analysis_results)
+    
     # Otherwise, use OpenAI to generate a more intelligent suggestion
     try:
-        return generate_ai_suggestion(analysis_results, timeframe)
+        return generate_ai_suggestion(analysis_results, timeframe, view)
     except Exception as e:
-        print(f"Error with OpenAI API: {e}")
+        return _suggestion_failed(e, analysis_results, timeframe, view)
+
+async def get_trading_suggestion_async(analysis_results, timeframe, client=None, semaphore=None):
+    """
+    Awaitable counterpart of get_trading_suggestion
+    
+    Args:
+        analysis_results (dict): The results of the chart analysis
+        timeframe (str): The timeframe of the chart
+        client (AsyncOpenAI, optional): Shared async client to issue the request with
+        semaphore (asyncio.Semaphore, optional): Limits concurrent OpenAI requests
+        
+    Returns:
+        dict: A trading suggestion including action, rationale, and key levels
+    """
+    if not OPENAI_API_KEY:
         return generate_rule_based_suggestion(analysis_results, timeframe)
+    
+    try:
+        if semaphore is None:
+            return await generate_ai_suggestion_async(analysis_results, timeframe, client)
+        async with semaphore:
+            return await generate_ai_suggestion_async(analysis_results, timeframe, client)
+    except Exception as e:
+        return _suggestion_failed(e, analysis_results, timeframe)
+
+async def get_trading_suggestions_batch(items, max_concurrency=8):
+    """
+    Generate trading suggestions for several charts concurrently
+    
+    Args:
+        items (list): (analysis_results, timeframe) tuples
+        max_concurrency (int): Maximum number of in-flight OpenAI requests
+        
+    Returns:
+        list: Trading suggestions in the same order as items
+    """
+    if not OPENAI_API_KEY:
+        return [generate_rule_based_suggestion(results, timeframe) for results, timeframe in items]
+    
+    # The client and semaphore are bound to the running event loop, so they
+    # are created per batch rather than at module load
+    semaphore = asyncio.Semaphore(max_concurrency)
+    async with _async_client() as client:
+        return await asyncio.gather(*[
+            get_trading_suggestion_async(results, timeframe, client, semaphore)
+            for results, timeframe in items
+        ])
 
-def generate_ai_suggestion(analysis_results, timeframe):
+def generate_ai_suggestion(analysis_results, timeframe, view=None):
     """
     Generate a trading suggestion using OpenAI
     
     Args:
         analysis_results (dict): The results of the chart analysis
         timeframe (str): The timeframe of the chart
+        view (AnalysisView, optional): Output of _to_view, if the caller already has it
         
     Returns:
         dict: A trading suggestion including action, rationale, and key levels
@@ -50,203 +239,377 @@ def generate_ai_suggestion(analysis_results, timeframe):
     # Check if OpenAI client is available
     if not openai:
         print("OpenAI client not available. Falling back to rule-based suggestion.")
-        return generate_rule_based_suggestion(analysis_results, timeframe)
+        return _fallback_suggestion(analysis_results, timeframe, view)
     
-    # Format the analysis results for the prompt
-    patterns_text = ""
-    for pattern in analysis_results["patterns"]:
-        patterns_text += f"- {pattern['name']} (Confidence: {pattern['confidence']:.2f}): {pattern['description']}\n"
+    view, request = _suggestion_request(analysis_results, timeframe, view)
     
-    indicators = analysis_results["indicators"]
+    try:
+        # Call the OpenAI API
+        stream = _with_retries(openai.chat.completions.create, **request)
+        return _parse_suggestion(_read_json_stream(stream))
+    except Exception as e:
+        # Fall back to rule-based suggestion for any error
+        return _suggestion_failed(e, analysis_results, timeframe, view)
+
+async def generate_ai_suggestion_async(analysis_results, timeframe, client=None):
+    """
+    Generate a trading suggestion using the async OpenAI client
     
-    # Format moving averages
-    ma_text = "Moving Averages:\n"
-    for ma_name, ma_data in indicators["moving_averages"].items():
-        ma_text += f"- {ma_name.upper()}: {ma_data['value']:.2f} ({ma_data['trend']})\n"
+    Args:
+        analysis_results (dict): The results of the chart analysis
+        timeframe (str): The timeframe of the chart
+        client (AsyncOpenAI, optional): Shared async client; a temporary one is created if omitted
+        
+    Returns:
+        dict: A trading suggestion including action, rationale, and key levels
+    """
+    if client is None:
+        async with _async_client() as owned_client:
+            return await generate_ai_suggestion_async(analysis_results, timeframe, owned_client)
     
-    # Format oscillators
-    osc_text = "Oscillators:\n"
-    osc_text += f"- RSI: {indicators['oscillators']['rsi']['value']:.2f} ({indicators['oscillators']['rsi']['trend']})\n"
-    osc_text += f"- MACD Line: {indicators['oscillators']['macd']['line']:.2f}, Signal: {indicators['oscillators']['macd']['signal']:.2f} ({indicators['oscillators']['macd']['trend']})\n"
-    osc_text += f"- Stochastic K: {indicators['oscillators']['stochastic']['k']:.2f} ({indicators['oscillators']['stochastic']['trend']})\n"
+    view, request = _suggestion_request(analysis_results, timeframe)
     
-    # Format support/resistance
-    sr_text = "Support and Resistance:\n"
-    sr_text += f"- Support: {indicators['support_resistance']['support']}\n"
-    sr_text += f"- Resistance: {indicators['support_resistance']['resistance']}\n"
+    try:
+        stream = await _with_retries_async(client.chat.completions.create, **request)
+        return _parse_suggestion(await _read_json_stream_async(stream))
+    except Exception as e:
+        return _suggestion_failed(e, analysis_results, timeframe, view)
+
+def _async_client():
+    # One pooled transport per client; callers share the client across a batch
+    return AsyncOpenAI(
+        api_key=OPENAI_API_KEY,
+        max_retries=0,
+        http_client=DefaultAsyncHttpxClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    )
+
+def _json_loads(content):
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def _build_prompt(analysis_text, timeframe):
+    """
+    Format the analysis results into the user prompt sent to OpenAI
     
-    # Create the prompt for OpenAI
-    prompt = f"""
-    Analyze the following stock chart data and provide a trading suggestion for the {timeframe} timeframe:
+    Args:
+        analysis_text (str): The analysis section built by _to_view
+        timeframe (str): The timeframe of the chart
+        
+    Returns:
+        str: The prompt text
+    """
+    return PROMPT_TEMPLATE.format_map({
+        "suggestion_fields": SUGGESTION_FIELDS,
+        "timeframe": timeframe,
+        "analysis": analysis_text
+    })
+
+def _to_view(analysis_results):
+    """
+    Canonicalize one analysis into an AnalysisView in a single walk
     
-    Detected Patterns:
-    {patterns_text}
+    The nested dicts are dereferenced once here; the prompt text and the
+    rule-based score are built in the same pass.
     
-    Technical Indicators:
-    {ma_text}
-    {osc_text}
-    {sr_text}
+    Args:
+        analysis_results (dict): The results of the chart analysis
+        
+    Returns:
+        AnalysisView: The flattened analysis
+    """
+    indicators = analysis_results["indicators"]
+    oscillators = indicators["oscillators"]
+    patterns = analysis_results["patterns"]
+    moving_averages = indicators["moving_averages"]
+    rsi = oscillators["rsi"]
+    macd = oscillators["macd"]
+    stoch = oscillators["stochastic"]
+    support = indicators["support_resistance"]["support"]
+    resistance = indicators["support_resistance"]["resistance"]
     
-    Based on this analysis, provide a trading suggestion in JSON format with the following fields:
-    1. action: A clear directional recommendation using terms like "STRONG LONG", "LONG", "WEAK LONG", "NEUTRAL", "WEAK SHORT", "SHORT", or "STRONG SHORT"
-    2. rationale: A brief explanation of the recommendation (2-3 sentences)
-    3. entry_point: A suggested entry price
-    4. stop_loss: A suggested stop loss price
-    5. take_profit: A suggested take profit price
-    6. strength: A confidence percentage (0-100) indicating the strength of the signal
+    # Format the detected patterns and encode each as a signed weight
+    pattern_lines = []
+    pattern_weights = []
+    pattern_confidences = []
+    for pattern in patterns:
+        confidence = pattern["confidence"]
+        pattern_lines.append(f"- {pattern['name']} (Confidence: {confidence:.2f}): {pattern['description']}\n")
+        pattern_weights.append(_pattern_weight(pattern["name"]))
+        pattern_confidences.append(confidence)
     
-    Your suggestion should be fair, unbiased, and based solely on the technical analysis provided.
+    # Format moving averages and score their trends (positive = bullish, negative = bearish)
+    ma_lines = ["Moving Averages:\n"]
+    indicator_scores = []
+    for ma_name, ma_data in moving_averages.items():
+        trend = ma_data["trend"]
+        ma_lines.append(f"- {ma_name.upper()}: {ma_data['value']:.2f} ({trend})\n")
+        indicator_scores.append(MA_TREND_SCORES.get(trend, 0))
+    
+    # Format oscillators
+    osc_text = (
+        "Oscillators:\n"
+        f"- RSI: {rsi['value']:.2f} ({rsi['trend']})\n"
+        f"- MACD Line: {macd['line']:.2f}, Signal: {macd['signal']:.2f} ({macd['trend']})\n"
+        f"- Stochastic K: {stoch['k']:.2f} ({stoch['trend']})\n"
+    )
+    indicator_scores.append(RSI_TREND_SCORES.get(rsi["trend"], 0))
+    indicator_scores.append(MACD_TREND_SCORES.get(macd["trend"], 0))
+    indicator_scores.append(STOCHASTIC_TREND_SCORES.get(stoch["trend"], 0))
+    
+    # Format support/resistance
+    sr_text = (
+        "Support and Resistance:\n"
+        f"- Support: {support}\n"
+        f"- Resistance: {resistance}\n"
+    )
+    
+    analysis_text = ANALYSIS_TEMPLATE.format_map({
+        "patterns_text": "".join(pattern_lines),
+        "ma_text": "".join(ma_lines),
+        "osc_text": osc_text,
+        "sr_text": sr_text
+    })
+    return AnalysisView(
+        patterns=patterns,
+        moving_averages=moving_averages,
+        rsi=rsi,
+        macd=macd,
+        stochastic=stoch,
+        support=support,
+        resistance=resistance,
+        analysis_text=analysis_text,
+        signal_diff=_score_signals(indicator_scores, pattern_weights, pattern_confidences)
+    )
+
+def _suggestion_request(analysis_results, timeframe, view=None):
     """
+    Build the streamed completion request shared by the sync and async paths
     
-    try:
-        # Call the OpenAI API
-        # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-        # do not change this unless explicitly requested by the user
-        response = openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an expert technical analyst who provides unbiased trading suggestions based on chart analysis."},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=500
-        )
-        
-        suggestion = json.loads(response.choices[0].message.content)
+    Args:
+        analysis_results (dict): The results of the chart analysis
+        timeframe (str): The timeframe of the chart
+        view (AnalysisView, optional): Output of _to_view, if the caller already has it
         
-        # Ensure all required fields are present
-        required_fields = ["action", "rationale", "entry_point", "stop_loss", "take_profit"]
-        for field in required_fields:
-            if field not in suggestion:
-                raise ValueError(f"Missing required field: {field}")
+    Returns:
+        tuple: (view, keyword arguments for chat.completions.create)
+    """
+    if view is None:
+        view = _to_view(analysis_results)
+    prompt = _build_prompt(view.analysis_text, timeframe)
+    return view, {"stream": True, **_completion_args(prompt)}
+
+def _completion_args(prompt):
+    # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
+    # do not change this unless explicitly requested by the user
+    return {
+        "model": "gpt-4o",
+        "messages": [
+            SYSTEM_MESSAGE,
+            {"role": "user", "content": prompt}
+        ],
+        "response_format": {"type": "json_schema", "json_schema": SUGGESTION_SCHEMA},
+        "max_tokens": SUGGESTION_MAX_TOKENS
+    }
+
+def _parse_suggestion(content):
+    """
+    Parse and validate the JSON suggestion returned by OpenAI
+    
+    Args:
+        content (str): The JSON text of the suggestion
         
-        # Add strength field if not present
-        if "strength" not in suggestion:
-            suggestion["strength"] = 75
+    Returns:
+        dict: A trading suggestion including action, rationale, and key levels
+    """
+    return _validate_suggestion(_json_loads(content))
+
+def _read_json_stream(stream):
+    """
+    Read a streamed completion until its JSON object is complete
+    
+    The stream is closed as soon as the closing brace arrives, so the caller
+    does not wait on (or pay for) anything the model emits afterwards.
+    
+    Args:
+        stream (Stream): A chat completion opened with stream=True
         
-        return suggestion
-    except Exception as e:
-        error_msg = str(e)
-        print(f"Error with OpenAI API: {error_msg}")
+    Returns:
+        str: The JSON text of the object
+    """
+    parts = []
+    state = [0, False, False]
+    try:
+        for chunk in stream:
+            if _take_chunk(chunk, parts, state):
+                break
+    finally:
+        stream.close()
+    return _joined_json(parts)
+
+async def _read_json_stream_async(stream):
+    """
+    Async counterpart of _read_json_stream
+    """
+    parts = []
+    state = [0, False, False]
+    try:
+        async for chunk in stream:
+            if _take_chunk(chunk, parts, state):
+                break
+    finally:
+        await stream.close()
+    return _joined_json(parts)
+
+def _take_chunk(chunk, parts, state):
+    # Append the chunk's text up to the end of the JSON object; True once it is complete
+    if not chunk.choices:
+        return False
+    text = chunk.choices[0].delta.content
+    if not text:
+        return False
+    end = _scan_json(text, state)
+    parts.append(text[:end])
+    return end is not None
+
+def _joined_json(parts):
+    # A refusal streams in delta.refusal and leaves the content empty
+    if not parts:
+        raise ValueError("OpenAI returned no suggestion content")
+    return "".join(parts)
+
+def _scan_json(text, state):
+    """
+    Advance a brace counter over the next piece of streamed JSON
+    
+    Args:
+        text (str): The newly received text
+        state (list): [depth, inside a string, after a backslash], updated in place
         
-        # Check for specific quota error
-        if "quota" in error_msg.lower() or "insufficient_quota" in error_msg:
-            print("OpenAI API quota exceeded. Falling back to rule-based analysis.")
-            # Clear the API key from environment to prevent further attempts
-            os.environ["OPENAI_API_KEY"] = ""
+    Returns:
+        int: Offset just past the closing brace of the top-level object, or None
+    """
+    depth, in_string, escaped = state
+    for offset, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{" or char == "[":
+            depth += 1
+        elif char == "}" or char == "]":
+            depth -= 1
+            if depth == 0:
+                state[:] = depth, in_string, escaped
+                return offset + 1
+    state[:] = depth, in_string, escaped
+    return None
+
+def _validate_suggestion(suggestion):
+    # The schema guarantees the fields; only the strength range is left to enforce
+    suggestion["strength"] = max(0, min(100, int(suggestion["strength"])))
+    return suggestion
+
+def _with_retries(create, **kwargs):
+    """
+    Call an OpenAI endpoint, retrying transient failures with jittered backoff
+    
+    Args:
+        create (callable): The client method to call
+        **kwargs: Arguments for the call
         
-        # Fall back to rule-based suggestion for any error
-        return generate_rule_based_suggestion(analysis_results, timeframe)
+    Returns:
+        The API response
+    """
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            return create(**kwargs)
+        except RETRYABLE_ERRORS as e:
+            if not _should_retry(e, attempt):
+                raise
+            time.sleep(_retry_delay(attempt))
+
+async def _with_retries_async(create, **kwargs):
+    """
+    Async counterpart of _with_retries; backs off without blocking the event loop
+    """
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            return await create(**kwargs)
+        except RETRYABLE_ERRORS as e:
+            if not _should_retry(e, attempt):
+                raise
+            await asyncio.sleep(_retry_delay(attempt))
+
+def _should_retry(error, attempt):
+    # The retry policy for both _with_retries and _with_retries_async
+    return not _is_quota_error(error) and attempt < RETRY_ATTEMPTS - 1
+
+def _retry_delay(attempt):
+    # Full jitter: uniform in [0, capped exponential]
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+def _is_quota_error(error):
+    # An exhausted quota is reported as a 429 too, but waiting won't fix it
+    error_msg = str(error)
+    return "quota" in error_msg.lower() or "insufficient_quota" in error_msg
+
+def _handle_api_error(error):
+    print(f"Error with OpenAI API: {error}")
+    
+    # Check for specific quota error
+    if _is_quota_error(error):
+        print("OpenAI API quota exceeded. Falling back to rule-based analysis.")
+        # Clear the API key from environment to prevent further attempts
+        os.environ["OPENAI_API_KEY"] = ""
+
+def _suggestion_failed(error, analysis_results, timeframe, view=None):
+    # Shared failure handling for the sync and async OpenAI paths
+    _handle_api_error(error)
+    return _fallback_suggestion(analysis_results, timeframe, view)
 
-def generate_rule_based_suggestion(analysis_results, timeframe):
+def _fallback_suggestion(analysis_results, timeframe, view=None):
+    # Rule-based suggestion standing in for a failed OpenAI request, marked so
+    # callers can avoid caching it past the outage
+    suggestion = generate_rule_based_suggestion(analysis_results, timeframe, view)
+    suggestion["fallback"] = True
+    return suggestion
+
+def generate_rule_based_suggestion(analysis_results, timeframe, view=None):
     """
     Generate a trading suggestion based on simple rules
     
     Args:
         analysis_results (dict): The results of the chart analysis
         timeframe (str): The timeframe of the chart
+        view (AnalysisView, optional): Output of _to_view, if the caller already has it
         
     Returns:
         dict: A trading suggestion including action, rationale, and key levels
     """
-    # Extract key indicators
-    indicators = analysis_results["indicators"]
-    patterns = analysis_results["patterns"]
-    
-    # Count bullish and bearish signals
-    bullish_signals = 0
-    bearish_signals = 0
-    
-    # Check moving averages
-    for ma_name, ma_data in indicators["moving_averages"].items():
-        if ma_data["trend"] == "Bullish":
-            bullish_signals += 1
-        elif ma_data["trend"] == "Bearish":
-            bearish_signals += 1
-    
-    # Check oscillators
-    rsi = indicators["oscillators"]["rsi"]
-    macd = indicators["oscillators"]["macd"]
-    stoch = indicators["oscillators"]["stochastic"]
-    
-    # RSI
-    if rsi["trend"] == "Oversold":
-        bullish_signals += 2
-    elif rsi["trend"] == "Overbought":
-        bearish_signals += 2
-    
-    # MACD
-    if macd["trend"] == "Bullish":
-        bullish_signals += 2
-    elif macd["trend"] == "Bearish":
-        bearish_signals += 2
-    
-    # Stochastic
-    if stoch["trend"] == "Oversold":
-        bullish_signals += 1
-    elif stoch["trend"] == "Overbought":
-        bearish_signals += 1
-    
-    # Check patterns
-    for pattern in patterns:
-        if "Uptrend" in pattern["name"] or "Bullish" in pattern["name"] or "Double Bottom" in pattern["name"]:
-            bullish_signals += 2 * pattern["confidence"]
-        elif "Downtrend" in pattern["name"] or "Bearish" in pattern["name"] or "Double Top" in pattern["name"]:
-            bearish_signals += 2 * pattern["confidence"]
-        elif "Head and Shoulders" in pattern["name"]:
-            bearish_signals += 2 * pattern["confidence"]
-        elif "Triangle" in pattern["name"]:
-            if "Ascending" in pattern["name"]:
-                bullish_signals += pattern["confidence"]
-            elif "Descending" in pattern["name"]:
-                bearish_signals += pattern["confidence"]
+    if view is None:
+        view = _to_view(analysis_results)
+    signal_diff = view.signal_diff
     
     # Determine action based on signals
-    signal_diff = bullish_signals - bearish_signals
-    
-    # Use more direct LONG/SHORT terminology
-    if signal_diff > 4:
-        action = "STRONG LONG"
-        rationale = f"Multiple bullish indicators and patterns suggest strong upward momentum on the {timeframe} timeframe. Moving averages are aligned bullishly with positive oscillator readings."
-    elif signal_diff > 2:
-        action = "LONG"
-        rationale = f"Bullish signals outweigh bearish ones on the {timeframe} timeframe. Technical indicators suggest potential upward movement with moderate strength."
-    elif signal_diff > 0:
-        action = "WEAK LONG"
-        rationale = f"Slightly bullish signals on the {timeframe} timeframe, but caution is advised. Some indicators show positive momentum, but conviction is not strong."
-    elif signal_diff == 0:
-        action = "NEUTRAL"
-        rationale = f"Mixed signals on the {timeframe} timeframe suggest a sideways market. Equal bullish and bearish pressure indicates no clear direction at this time."
-    elif signal_diff > -2:
-        action = "WEAK SHORT"
-        rationale = f"Slightly bearish signals on the {timeframe} timeframe. Some indicators show negative momentum, but conviction is not strong."
-    elif signal_diff > -4:
-        action = "SHORT"
-        rationale = f"Bearish signals outweigh bullish ones on the {timeframe} timeframe. Technical indicators suggest potential downward movement with moderate strength."
-    else:
-        action = "STRONG SHORT"
-        rationale = f"Multiple bearish indicators and patterns suggest strong downward momentum on the {timeframe} timeframe. Moving averages are aligned bearishly with negative oscillator readings."
+    action, direction, rationale = _select_action(signal_diff)
+    rationale = rationale.format(timeframe=timeframe)
     
     # Determine entry, stop loss, and take profit levels
-    support_levels = indicators["support_resistance"]["support"]
-    resistance_levels = indicators["support_resistance"]["resistance"]
+    nearest = {"support": view.support[0], "resistance": view.resistance[0]}
     
     # Simple calculation for a "current price" based on support and resistance
-    current_price = (support_levels[0] + resistance_levels[-1]) / 2
-    
-    # Set entry, stop loss, and take profit based on action
-    if "LONG" in action:
-        entry_point = current_price
-        stop_loss = support_levels[0] * 0.99  # Just below nearest support
-        take_profit = resistance_levels[0] * 1.01  # Just above nearest resistance
-    elif "SHORT" in action:
-        entry_point = current_price
-        stop_loss = resistance_levels[0] * 1.01  # Just above nearest resistance
-        take_profit = support_levels[0] * 0.99  # Just below nearest support
-    else:  # NEUTRAL
-        entry_point = current_price
-        stop_loss = support_levels[0] * 0.98  # Further below support for neutral stance
-        take_profit = resistance_levels[0] * 1.02  # Further above resistance for neutral stance
+    entry_point = (nearest["support"] + view.resistance[-1]) / 2
+    
+    # Set stop loss and take profit based on the direction of the action
+    stop_level, stop_mult, target_level, target_mult = LEVEL_MULTIPLIERS[direction]
+    stop_loss = nearest[stop_level] * stop_mult
+    take_profit = nearest[target_level] * target_mult
     
     # Format to 2 decimal places
     entry_point = round(entry_point, 2)
@@ -269,3 +632,70 @@ def generate_rule_based_suggestion(analysis_results, timeframe):
         "take_profit": take_profit,
         "strength": strength  # New field for signal strength percentage
     }
+
+def _select_action(signal_diff):
+    """
+    Pick the rule-based action for a signal difference
+    
+    Args:
+        signal_diff (float): Net bullish minus bearish signal strength
+        
+    Returns:
+        tuple: (action, direction, rationale template)
+    """
+    if signal_diff == 0:
+        return NEUTRAL_ACTION
+    for bound, action, direction, rationale in RULE_ACTIONS:
+        if signal_diff > bound:
+            return action, direction, rationale
+    # Only reached for NaN, which the original chain also treated as STRONG SHORT
+    return RULE_ACTIONS[-1][1:]
+
+@lru_cache(maxsize=64)
+def _pattern_weight(name):
+    """
+    Signed weight of a detected pattern, scaled later by its confidence
+    
+    Pattern names come from a small fixed vocabulary, so each distinct name
+    is matched against PATTERN_RULES once and then served from the cache.
+    
+    Args:
+        name (str): The pattern name
+        
+    Returns:
+        int: 2/-2 for strong bullish/bearish patterns, 1/-1 for triangles, 0 otherwise
+    """
+    for rule, weight in PATTERN_RULES:
+        if rule.search(name):
+            return weight
+    return 0
+
+def _score_signals(indicator_scores, pattern_weights, pattern_confidences):
+    """
+    Net bullish minus bearish signal strength
+    
+    Args:
+        indicator_scores (list): Signed score of each indicator reading
+        pattern_weights (list): Signed weight of each detected pattern
+        pattern_confidences (list): Confidence of each detected pattern
+        
+    Returns:
+        float: The signal difference
+    """
+    # Bullish and bearish totals are accumulated separately, in the same order
+    # as the original counters, so the float result is bit-identical
+    bullish_signals = 0
+    bearish_signals = 0
+    for score in indicator_scores:
+        if score > 0:
+            bullish_signals += score
+        elif score < 0:
+            bearish_signals -= score
+    
+    for weight, confidence in zip(pattern_weights, pattern_confidences):
+        if weight > 0:
+            bullish_signals += weight * confidence
+        elif weight < 0:
+            bearish_signals += -weight * confidence
+    
+    return bullish_signals - bearish_signals
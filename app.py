@@ -1,14 +1,14 @@
 import streamlit as st
 import io
+import hashlib
 import os
+import threading
 from PIL import Image
-import numpy as np
-import pandas as pd
-import plotly.graph_objects as go
-from chart_analyzer import analyze_chart
-from ai_suggestions import get_trading_suggestion, generate_rule_based_suggestion
-import utils
 from auth import init_auth, require_auth
+from ui_components import (
+    APP_CSS, ABOUT_TIMEFRAMES, PATTERN_HELP, INDICATORS_HELP, HOW_IT_WORKS_HTML, DISCLAIMER_HTML,
+    RISK_REWARD_STYLES, build_results_html
+)
 
 # Page configuration
 st.set_page_config(
@@ -18,225 +18,170 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for a cleaner, more modern UI
-st.markdown("""
-<style>
-    /* Global styles */
-    .reportview-container .main .block-container {
-        max-width: 1200px;
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-    }
-    body {
-        background-color: #0a1929;
-        color: #ffffff;
-    }
-    h1, h2, h3, h4, h5, h6 {
-        color: #8b9eff;
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    }
-    
-    /* Main header */
-    .main-header {
-        font-size: 3.2rem;
-        font-weight: 700;
-        background: linear-gradient(90deg, #8b9eff, #c49bff);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        text-align: center;
-        margin-bottom: 0.2rem;
-        line-height: 1.2;
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    }
-    .sub-header {
-        font-size: 1.2rem;
-        color: #ffffff;
-        opacity: 0.8;
-        text-align: center;
-        margin-bottom: 2rem;
-        font-weight: 400;
-    }
-    .section-header {
-        font-size: 1.5rem;
-        font-weight: 600;
-        margin-top: 2rem;
-        color: #8b9eff;
-        padding-bottom: 0.5rem;
-        border-bottom: 1px solid #2d3747;
-    }
-    
-    /* Cards and containers */
-    .modern-card {
-        background-color: #121f33;
-        border-radius: 20px;
-        padding: 1.5rem;
-        margin-bottom: 1.5rem;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.15);
-        border: 1px solid #2d3747;
-    }
-    .upload-section {
-        border: 2px dashed #6c79ff;
-        border-radius: 20px;
-        padding: 2.5rem;
-        text-align: center;
-        margin: 1rem 0 2rem 0;
-        background-color: rgba(108, 121, 255, 0.05);
-        transition: all 0.3s ease;
-    }
-    .upload-section:hover {
-        background-color: rgba(108, 121, 255, 0.08);
-        transform: translateY(-5px);
-    }
-    
-    /* Button styling */
-    .modern-button {
-        background: linear-gradient(90deg, #6c79ff, #9b5de5);
-        color: white;
-        padding: 0.8rem 2rem;
-        border-radius: 50px;
-        font-weight: 600;
-        border: none;
-        cursor: pointer;
-        text-align: center;
-        transition: all 0.3s;
-        box-shadow: 0 4px 10px rgba(108, 121, 255, 0.3);
-        display: inline-block;
-        margin: 1rem auto;
-        width: auto;
-    }
-    .modern-button:hover {
-        transform: translateY(-3px);
-        box-shadow: 0 7px 15px rgba(108, 121, 255, 0.4);
-    }
-    
-    /* Analysis result styles */
-    .tab-content {
-        padding: 1.5rem;
-        background-color: #121f33;
-        border-radius: 0 0 15px 15px;
-        margin-top: -16px;
-        border: 1px solid #2d3747;
-        border-top: none;
-    }
-    .pattern-card {
-        background-color: #1a2942;
-        padding: 1.2rem;
-        border-radius: 15px;
-        margin-bottom: 1rem;
-        border: 1px solid #2d3747;
-        transition: transform 0.2s;
-    }
-    .pattern-card:hover {
-        transform: translateY(-3px);
-    }
-    .metric-card {
-        background-color: #1a2942;
-        padding: 1.2rem;
-        border-radius: 15px;
-        border: 1px solid #2d3747;
-        transition: transform 0.3s;
-    }
-    .metric-card:hover {
-        transform: translateY(-3px);
-        box-shadow: 0 6px 12px rgba(0, 0, 0, 0.2);
-    }
-    
-    /* Indicator badges */
-    .time-badge {
-        background-color: rgba(108, 121, 255, 0.2);
-        color: #8b9eff;
-        padding: 0.3rem 0.8rem;
-        border-radius: 50px;
-        font-weight: 600;
-        font-size: 0.9rem;
-        display: inline-block;
-        margin-left: 1rem;
-    }
-    
-    /* Disclaimer */
-    .disclaimer {
-        background-color: rgba(108, 121, 255, 0.07);
-        padding: 1rem;
-        border-radius: 12px;
-        margin-top: 2rem;
-        text-align: center;
-        font-style: italic;
-        color: #ffffff;
-        opacity: 0.7;
-        border: 1px solid rgba(108, 121, 255, 0.2);
-        font-size: 0.9rem;
-    }
-    
-    /* Footer section */
-    .footer-section {
-        margin-top: 3rem;
-        padding-top: 1.5rem;
-        border-top: 1px solid #2d3747;
-        text-align: center;
-        font-size: 0.9rem;
-        opacity: 0.7;
-    }
-    .how-it-works {
-        display: flex;
-        justify-content: center;
-        margin: 1rem 0;
-        flex-wrap: wrap;
-    }
-    .step-item {
-        display: flex;
-        align-items: center;
-        margin: 0 1rem;
-        padding: 0.5rem 1rem;
-        background-color: rgba(108, 121, 255, 0.07);
-        border-radius: 50px;
-        margin-bottom: 0.5rem;
-    }
-    .step-number {
-        background: linear-gradient(90deg, #6c79ff, #9b5de5);
-        color: white;
-        width: 25px;
-        height: 25px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        border-radius: 50%;
-        margin-right: 0.8rem;
-        font-weight: bold;
-        font-size: 0.8rem;
-    }
-    
-    /* Streamlit element modifications */
-    .css-1kyxreq {
-        justify-content: center !important;
-    }
-    [data-testid="stSidebar"] {
-        background-color: #0a1929;
-        border-right: 1px solid #2d3747;
-    }
-    [data-testid="stSidebar"] .css-1d391kg {
-        background-color: #121f33;
-    }
-    .stProgress > div > div > div > div {
-        background: linear-gradient(90deg, #6c79ff, #9b5de5);
-    }
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-    }
-    .stTabs [data-baseweb="tab"] {
-        background-color: #121f33;
-        border-radius: 15px 15px 0 0;
-        border: 1px solid #2d3747;
-        border-bottom: none;
-        color: #ffffff;
-        padding: 10px 20px;
-    }
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(180deg, #1a2942, #121f33);
-        color: #8b9eff;
-        font-weight: bold;
-    }
-</style>
-""", unsafe_allow_html=True)
+def _chart_key(uploaded_file):
+    """
+    Hash an uploaded chart into the key the cached functions below are keyed on
+    
+    Args:
+        uploaded_file (UploadedFile): The uploaded file
+        
+    Returns:
+        str: Hex digest of the file contents
+    """
+    # file_digest hashes a BytesIO (which UploadedFile is) straight from its
+    # buffer, without building a bytes copy of the upload
+    return hashlib.file_digest(uploaded_file, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+# Charts are downscaled to fit in this box before analysis unless
+# "Full resolution analysis" is switched on in the sidebar
+ANALYSIS_MAX_SIZE = (1280, 1280)
+
+# The leading underscore on _file_bytes tells Streamlit's caches not to hash
+# the (possibly multi-MB) upload again; chart_key already identifies it.
+# cache_resource rather than cache_data: the array is handed out by reference
+# instead of being unpickled into a fresh copy on every call
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _decode_chart(chart_key, full_resolution, _file_bytes):
+    """
+    Decode an uploaded chart into a pixel array, once per distinct upload
+    
+    Args:
+        chart_key (str): Hash of the file contents from _chart_key
+        full_resolution (bool): Keep the original size instead of downscaling
+            to ANALYSIS_MAX_SIZE
+        _file_bytes (bytes): Raw contents of the uploaded file
+        
+    Returns:
+        numpy.ndarray: The decoded image in OpenCV (BGR) channel order,
+            marked read-only since it is shared across reruns and sessions
+    """
+    import numpy as np
+    image = Image.open(io.BytesIO(_file_bytes))
+    if not full_resolution:
+        # No-op for charts that already fit; keeps the aspect ratio otherwise
+        image.thumbnail(ANALYSIS_MAX_SIZE, Image.Resampling.LANCZOS)
+    image_array = np.asarray(image)
+    
+    # PIL decodes to RGB(A) while the analysis expects BGR; reversing the first
+    # three channels is a view, and also drops any alpha channel
+    if image_array.ndim == 3 and image_array.shape[2] >= 3:
+        image_array = image_array[..., 2::-1]
+    image_array.setflags(write=False)
+    return image_array
+
+# The uploaded chart is shown as a WebP thumbnail that fits in this box
+PREVIEW_MAX_SIZE = (1600, 1600)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _preview_chart(chart_key, _file_bytes):
+    """
+    Encode a downscaled WebP preview of an uploaded chart, once per distinct upload
+    
+    Args:
+        chart_key (str): Hash of the file contents from _chart_key
+        _file_bytes (bytes): Raw contents of the uploaded file
+        
+    Returns:
+        bytes: The encoded preview
+    """
+    image = Image.open(io.BytesIO(_file_bytes))
+    image.thumbnail(PREVIEW_MAX_SIZE)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=80, method=4)
+    return buffer.getvalue()
+
+class _UncachedResult(Exception):
+    """Carries a result out of a cached function without st.cache_data storing it"""
+    def __init__(self, result):
+        super().__init__("uncached result")
+        self.result = result
+
+@st.cache_data(show_spinner=False, ttl=24 * 60 * 60, max_entries=32)
+def _cached_analysis(chart_key, timeframe, full_resolution, _file_bytes):
+    """
+    Analyze a chart, once per chart and timeframe
+    
+    Args:
+        chart_key (str): Hash of the file contents from _chart_key
+        timeframe (str): The timeframe of the chart
+        full_resolution (bool): Analyze the chart at its original size
+        _file_bytes (bytes): Raw contents of the uploaded file
+        
+    Returns:
+        dict: The analysis results
+    """
+    # Heavy analysis modules (OpenCV, OpenAI client) are only imported
+    # once a chart is actually analyzed, not on every rerun
+    from chart_analyzer import analyze_chart
+    
+    return analyze_chart(_decode_chart(chart_key, full_resolution, _file_bytes), timeframe)
+
+@st.cache_data(show_spinner=False, ttl=60 * 60, max_entries=32)
+def _cached_suggestion(analysis_results, timeframe, ai_enabled):
+    """
+    Generate the trading suggestion for an analysis, reusing it for an hour
+    
+    OpenAI suggestions expire sooner than the analysis they are based on, so
+    a chart that stays cached for a day still gets a fresh suggestion hourly.
+    
+    Args:
+        analysis_results (dict): The results of the chart analysis
+        timeframe (str): The timeframe of the chart
+        ai_enabled (bool): Whether an OpenAI API key is set; only used as part of
+            the cache key so enabling AI doesn't serve a cached rule-based result
+        
+    Returns:
+        dict: The trading suggestion with its risk-reward fields
+    """
+    from ai_suggestions import get_trading_suggestion
+    
+    # Generate trading suggestion (will use rule-based if OpenAI fails)
+    trading_suggestion = get_trading_suggestion(analysis_results, timeframe)
+    _add_risk_reward(trading_suggestion)
+    
+    # A fallback stands in for an OpenAI outage (quota, rate limit, network),
+    # so it is raised past the cache rather than served for the next hour
+    if trading_suggestion.get("fallback"):
+        raise _UncachedResult(trading_suggestion)
+    return trading_suggestion
+
+def _add_risk_reward(trading_suggestion):
+    """
+    Compute the risk-reward ratio and its display fields once, alongside the analysis
+    
+    Args:
+        trading_suggestion (dict): The trading suggestion, updated in place
+    """
+    # The levels are numbers already: the JSON schema types them for AI
+    # suggestions and the rule-based suggestion computes them as floats
+    entry_point = trading_suggestion['entry_point']
+    risk = abs(entry_point - trading_suggestion['stop_loss'])
+    reward = abs(trading_suggestion['take_profit'] - entry_point)
+    risk_reward = reward / risk if risk > 0 else 0
+    
+    # Color coding and verdict for risk-reward
+    rr_color, rr_verdict = RISK_REWARD_STYLES[(risk_reward >= 1) + (risk_reward >= 2)]
+    
+    trading_suggestion.update({
+        "risk_reward": risk_reward,
+        "rr_color": rr_color,
+        "rr_verdict": rr_verdict,
+        "rr_bar_pct": min(risk_reward * 50, 100)
+    })
+
+def _warm_analysis_modules():
+    """
+    Import the analysis modules ahead of the first Analyze Chart click
+    """
+    import chart_analyzer
+    import ai_suggestions
+
+# Custom CSS for a cleaner, more modern UI. Streamlit clears injected styles
+# on every rerun, so the prebuilt stylesheet is emitted each time
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # Sidebar 
 with st.sidebar:
@@ -270,34 +215,21 @@ with st.sidebar:
     
     # Explanation of timeframes
     with st.expander("About Timeframes"):
-        st.markdown("""
-        - **1m/5m/15m/30m**: Short-term trading
-        - **1h/4h**: Intraday trading
-        - **1D/1W**: Swing/position trading
-        
-        The AI adjusts its analysis based on the selected timeframe.
-        """)
+        st.markdown(ABOUT_TIMEFRAMES)
+    
+    # Large screenshots are downscaled before analysis unless this is on
+    full_resolution = st.toggle("Full resolution analysis", value=False,
+                                help="Analyze the chart at its original size. Slower for large screenshots.")
     
     # Additional info
     st.markdown("<hr style='margin: 1.5rem 0; border-color: #2d3747;'>", unsafe_allow_html=True)
     st.markdown("<p style='text-align: center; font-weight: 500;'>Analysis Features</p>", unsafe_allow_html=True)
     
     with st.expander("Pattern Recognition"):
-        st.markdown("""
-        Detects common patterns like:
-        - Head and Shoulders
-        - Double Top/Bottom
-        - Triangle patterns
-        - Trend lines
-        """)
+        st.markdown(PATTERN_HELP)
     
     with st.expander("Technical Indicators"):
-        st.markdown("""
-        Analyzes multiple indicators:
-        - Moving Averages (SMA, EMA)
-        - Oscillators (RSI, MACD, Stochastic)
-        - Support/Resistance levels
-        """)
+        st.markdown(INDICATORS_HELP)
 
 # Initialize session state if not exist
 if 'analysis_complete' not in st.session_state:
@@ -306,6 +238,10 @@ if 'analysis_complete' not in st.session_state:
 if 'analysis_results' not in st.session_state:
     st.session_state.analysis_results = None
 
+# Bumped on every new analysis; keys the rendered results HTML below
+if 'results_version' not in st.session_state:
+    st.session_state.results_version = 0
+
 # Initialize the authentication system
 init_auth()
 
@@ -341,32 +277,48 @@ with st.container():
     </div>
     """, unsafe_allow_html=True)
     
-    # File uploader - simple version without the extra custom container
-    uploaded_file = st.file_uploader("Upload Chart Image", type=["jpg", "jpeg", "png"])
+    # Load the analysis modules in the background while the user picks a chart,
+    # so the lazy imports behind Analyze Chart are already in sys.modules
+    if 'modules_warmed' not in st.session_state:
+        st.session_state.modules_warmed = True
+        threading.Thread(target=_warm_analysis_modules, daemon=True).start()
     
-    # Add some better instructions if no file is uploaded
-    if uploaded_file is None:
-        st.markdown("""
-        <div style="text-align: center; margin: 1rem 0 2rem 0;">
-            <p style="color: #ffffff; opacity: 0.7;">Drag and drop your chart image here, or click to browse</p>
-            <p style="color: #ffffff; opacity: 0.5; font-size: 0.9rem;">Supported formats: JPG, JPEG, PNG</p>
-        </div>
-        """, unsafe_allow_html=True)
+    # Upload and analyze in one form: dropping a file doesn't trigger a rerun
+    # of its own, the script only reruns when Analyze Chart is submitted
+    with st.form("analyze_form", clear_on_submit=False, border=False):
+        # File uploader - simple version without the extra custom container
+        uploaded_file = st.file_uploader("Upload Chart Image", type=["jpg", "jpeg", "png"])
+        
+        # Add some better instructions if no file is uploaded
+        if uploaded_file is None:
+            st.markdown("""
+            <div style="text-align: center; margin: 1rem 0 2rem 0;">
+                <p style="color: #ffffff; opacity: 0.7;">Drag and drop your chart image here, or click to browse</p>
+                <p style="color: #ffffff; opacity: 0.5; font-size: 0.9rem;">Supported formats: JPG, JPEG, PNG</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        # Analyze button with improved styling
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            analyze_clicked = st.form_submit_button("Analyze Chart", use_container_width=True,
+                                                    help="Click to analyze the uploaded chart")
+    
+    if analyze_clicked and uploaded_file is None:
+        st.warning("Please upload a chart image first.")
 
 # Process uploaded image with enhanced UI
 if uploaded_file is not None:
-    # Display uploaded image
-    image = Image.open(uploaded_file)
-    st.image(image, caption="Uploaded Chart", use_container_width=True)
-    
-    # Analyze button with improved styling
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        st.markdown("<div style='text-align: center;'>", unsafe_allow_html=True)
-        # Only use the actual functional button, styled with CSS
-        analyze_clicked = st.button("Analyze Chart", key="analyze_button", use_container_width=True, 
-                                   help="Click to analyze the uploaded chart")
-        st.markdown("</div>", unsafe_allow_html=True)
+    # Display a small WebP preview rather than sending the full-size upload
+    chart_bytes = uploaded_file.getvalue()
+    
+    # file_id is stable for one upload, so the hash is computed once per upload
+    # rather than on every rerun
+    if st.session_state.get("chart_file_id") != uploaded_file.file_id:
+        st.session_state.chart_key = _chart_key(uploaded_file)
+        st.session_state.chart_file_id = uploaded_file.file_id
+    chart_key = st.session_state.chart_key
+    st.image(_preview_chart(chart_key, chart_bytes), caption="Uploaded Chart", use_container_width=True)
     
     if analyze_clicked:
         with st.spinner("Analyzing chart... This may take a moment."):
@@ -377,11 +329,12 @@ if uploaded_file is not None:
             
             # Perform analysis
             try:
-                # Analyze the chart image
-                analysis_results = analyze_chart(np.array(image), timeframe)
-                
-                # Generate trading suggestion (will use rule-based if OpenAI fails)
-                trading_suggestion = get_trading_suggestion(analysis_results, timeframe)
+                # Analyze the chart image and generate the trading suggestion
+                analysis_results = _cached_analysis(chart_key, timeframe, full_resolution, chart_bytes)
+                try:
+                    trading_suggestion = _cached_suggestion(analysis_results, timeframe, bool(api_key))
+                except _UncachedResult as uncached:
+                    trading_suggestion = uncached.result
                 
                 # Check if the OpenAI API key was cleared due to quota issues during the process
                 if api_key and not os.environ.get("OPENAI_API_KEY"):
@@ -393,16 +346,20 @@ if uploaded_file is not None:
                     "indicators": analysis_results["indicators"],
                     "trading_suggestion": trading_suggestion
                 }
+                # No st.rerun(): the results section below renders on this same run
                 st.session_state.analysis_complete = True
-                st.rerun()
+                st.session_state.results_version += 1
             except Exception as e:
                 error_msg = str(e)
                 if "OpenAI" in error_msg or "API" in error_msg:
                     st.warning(f"⚠️ OpenAI API issue: {error_msg}. Using rule-based analysis instead.")
                     try:
                         # Try again with rule-based analysis only
-                        analysis_results = analyze_chart(np.array(image), timeframe)
+                        from chart_analyzer import analyze_chart
+                        from ai_suggestions import generate_rule_based_suggestion
+                        analysis_results = analyze_chart(_decode_chart(chart_key, full_resolution, chart_bytes), timeframe)
                         trading_suggestion = generate_rule_based_suggestion(analysis_results, timeframe)
+                        _add_risk_reward(trading_suggestion)
                         
                         # Store results in session state
                         st.session_state.analysis_results = {
@@ -411,271 +368,66 @@ if uploaded_file is not None:
                             "trading_suggestion": trading_suggestion
                         }
                         st.session_state.analysis_complete = True
-                        st.rerun()
+                        st.session_state.results_version += 1
                     except Exception as inner_e:
                         st.error(f"Error in rule-based analysis: {str(inner_e)}")
                 else:
                     st.error(f"Error analyzing chart: {error_msg}")
 
-# Display results if analysis is complete with enhanced styling
-if st.session_state.analysis_complete and st.session_state.analysis_results is not None:
-    results = st.session_state.analysis_results
+@st.fragment
+def _render_results(results, timeframe):
+    """
+    Render the analysis results, one section at a time
     
-    st.markdown("<div class='section-header'>Analysis Results</div>", unsafe_allow_html=True)
+    Runs as a fragment so interactions inside the results only rerun this
+    function instead of the whole script. The section HTML is memoized in
+    session state per analysis and timeframe, so reruns skip rebuilding it.
     
-    # Display timeframe with badge
-    st.markdown(f"""
-    <div style="display: flex; align-items: center; margin-bottom: 1rem;">
-        <h3 style="margin: 0; padding: 0;">Chart Analysis</h3>
-        <div class="time-badge">{timeframe} Timeframe</div>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Create tabs for different result sections with enhanced styling
-    tab1, tab2, tab3 = st.tabs(["📊 Patterns", "📈 Indicators", "💡 Trading Suggestion"])
+    Args:
+        results (dict): Patterns, indicators and trading suggestion from the analysis
+        timeframe (str): The timeframe of the chart
+    """
+    # Kept in session state rather than st.cache_data: the version counter is
+    # per session, so it would collide across users in a global cache
+    html_key = (st.session_state.results_version, timeframe)
+    if st.session_state.get("results_html_key") != html_key:
+        st.session_state.results_html = build_results_html(results, timeframe)
+        st.session_state.results_html_key = html_key
+    html = st.session_state.results_html
     
-    with tab1:
-        st.markdown("<div class='tab-content'>", unsafe_allow_html=True)
-        st.markdown("<h4>Detected Patterns</h4>", unsafe_allow_html=True)
-        
-        if results["patterns"]:
-            for pattern in results["patterns"]:
-                st.markdown(f"""
-                <div class="pattern-card">
-                    <h5 style="color: #8b9eff;">{pattern['name']}</h5>
-                    <p>{pattern['description']}</p>
-                    <div style="margin: 0.5rem 0;">
-                """, unsafe_allow_html=True)
-                
-                # Progress bar for confidence
-                st.progress(pattern['confidence'])
-                
-                # Color coding for confidence
-                conf_color = "#03DAC6" if pattern['confidence'] > 0.7 else "#FFB740" if pattern['confidence'] > 0.5 else "#FF4F5E"
-                
-                st.markdown(f"""
-                    <p style="text-align: right; color: {conf_color}; font-weight: 500;">
-                        Confidence: {pattern['confidence']:.2f}
-                    </p>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-        else:
-            st.info("No significant patterns detected in this chart.")
-        
-        st.markdown("</div>", unsafe_allow_html=True)
+    # Section header and timeframe badge
+    st.markdown("<div class='section-header'>Analysis Results</div>" + html["badge"], unsafe_allow_html=True)
     
-    with tab2:
-        st.markdown("<div class='tab-content'>", unsafe_allow_html=True)
-        indicators = results["indicators"]
-        
-        # Moving Averages section
-        st.markdown("<h4>Moving Averages</h4>", unsafe_allow_html=True)
-        
-        # Create a cleaner display for moving averages
-        ma_cols = st.columns(5)
-        mas = [
-            {"name": "SMA 20", "value": indicators['moving_averages']['sma_20']['value'], "trend": indicators['moving_averages']['sma_20']['trend']},
-            {"name": "SMA 50", "value": indicators['moving_averages']['sma_50']['value'], "trend": indicators['moving_averages']['sma_50']['trend']},
-            {"name": "SMA 200", "value": indicators['moving_averages']['sma_200']['value'], "trend": indicators['moving_averages']['sma_200']['trend']},
-            {"name": "EMA 12", "value": indicators['moving_averages']['ema_12']['value'], "trend": indicators['moving_averages']['ema_12']['trend']},
-            {"name": "EMA 26", "value": indicators['moving_averages']['ema_26']['value'], "trend": indicators['moving_averages']['ema_26']['trend']}
-        ]
-        
-        for i, col in enumerate(ma_cols):
-            with col:
-                trend_color = "#03DAC6" if mas[i]["trend"] == "Bullish" else "#FF4F5E" if mas[i]["trend"] == "Bearish" else "#ffffff"
-                st.markdown(f"""
-                <div style="text-align: center; padding: 0.8rem; border-radius: 12px; border: 1px solid #2d3747; background-color: #1a2942;">
-                    <h5 style="margin: 0; font-size: 1rem;">{mas[i]["name"]}</h5>
-                    <p style="font-size: 1.2rem; font-weight: 600; margin: 0.3rem 0;">{mas[i]["value"]:.2f}</p>
-                    <p style="margin: 0; color: {trend_color};">{mas[i]["trend"]}</p>
-                </div>
-                """, unsafe_allow_html=True)
-        
-        # Oscillators section
-        st.markdown("<h4 style='margin-top: 1.5rem;'>Oscillators</h4>", unsafe_allow_html=True)
-        
-        # Create three columns for oscillators
-        osc_cols = st.columns(3)
-        
-        # RSI
-        with osc_cols[0]:
-            rsi_color = "#FF4F5E" if indicators['oscillators']['rsi']['trend'] == "Overbought" else "#03DAC6" if indicators['oscillators']['rsi']['trend'] == "Oversold" else "#ffffff"
-            st.markdown(f"""
-            <div class="metric-card">
-                <h5 style="margin: 0; color: #8b9eff;">RSI (14)</h5>
-                <p style="font-size: 1.5rem; font-weight: 600; margin: 0.5rem 0; color: #ffffff;">{indicators['oscillators']['rsi']['value']:.2f}</p>
-                <p style="margin: 0; color: {rsi_color};">{indicators['oscillators']['rsi']['trend']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # MACD
-        with osc_cols[1]:
-            macd_color = "#03DAC6" if indicators['oscillators']['macd']['trend'] == "Bullish" else "#FF4F5E" if indicators['oscillators']['macd']['trend'] == "Bearish" else "#ffffff"
-            st.markdown(f"""
-            <div class="metric-card">
-                <h5 style="margin: 0; color: #8b9eff;">MACD</h5>
-                <p style="font-size: 1.5rem; font-weight: 600; margin: 0.5rem 0; color: #ffffff;">{indicators['oscillators']['macd']['line']:.2f}</p>
-                <p style="margin: 0; color: {macd_color};">{indicators['oscillators']['macd']['trend']}</p>
-                <p style="margin: 0; font-size: 0.8rem; opacity: 0.7;">Signal: {indicators['oscillators']['macd']['signal']:.2f}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        # Stochastic
-        with osc_cols[2]:
-            stoch_color = "#FF4F5E" if indicators['oscillators']['stochastic']['trend'] == "Overbought" else "#03DAC6" if indicators['oscillators']['stochastic']['trend'] == "Oversold" else "#ffffff"
-            st.markdown(f"""
-            <div class="metric-card">
-                <h5 style="margin: 0; color: #8b9eff;">Stochastic</h5>
-                <p style="font-size: 1.5rem; font-weight: 600; margin: 0.5rem 0; color: #ffffff;">{indicators['oscillators']['stochastic']['k']:.2f}</p>
-                <p style="margin: 0; color: {stoch_color};">{indicators['oscillators']['stochastic']['trend']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Support and Resistance levels
-        st.markdown("<h4 style='margin-top: 1.5rem;'>Support & Resistance</h4>", unsafe_allow_html=True)
-        
-        # Create two columns for support and resistance
-        sr_cols = st.columns(2)
-        
-        # Support levels
-        with sr_cols[0]:
-            st.markdown(f"""
-            <div style="padding: 1rem; border-radius: 12px; border: 1px solid rgba(3, 218, 198, 0.3); background-color: rgba(3, 218, 198, 0.05);">
-                <h5 style="margin: 0; color: #03DAC6;">Support Levels</h5>
-                <p style="font-size: 1.2rem; font-weight: 600; margin: 0.5rem 0; color: #ffffff;">S1: {indicators['support_resistance']['support'][0]}</p>
-                <p style="font-size: 1.1rem; margin: 0.5rem 0; color: #ffffff; opacity: 0.8;">S2: {indicators['support_resistance']['support'][1]}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        # Resistance levels
-        with sr_cols[1]:
-            st.markdown(f"""
-            <div style="padding: 1rem; border-radius: 12px; border: 1px solid rgba(255, 79, 94, 0.3); background-color: rgba(255, 79, 94, 0.05);">
-                <h5 style="margin: 0; color: #FF4F5E;">Resistance Levels</h5>
-                <p style="font-size: 1.2rem; font-weight: 600; margin: 0.5rem 0; color: #ffffff;">R1: {indicators['support_resistance']['resistance'][0]}</p>
-                <p style="font-size: 1.1rem; margin: 0.5rem 0; color: #ffffff; opacity: 0.8;">R2: {indicators['support_resistance']['resistance'][1]}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
+    # Only the selected section is sent to the browser; st.tabs would send
+    # all three on every run. Switching sections only reruns this fragment
+    view = st.radio("Results view", ["📊 Patterns", "📈 Indicators", "💡 Trading Suggestion"],
+                    horizontal=True, label_visibility="collapsed", key="results_view")
     
-    with tab3:
-        st.markdown("<div class='tab-content'>", unsafe_allow_html=True)
-        trading_suggestion = results["trading_suggestion"]
-        
-        # Determine color based on action
-        if "buy" in trading_suggestion["action"].lower() or "bullish" in trading_suggestion["action"].lower():
-            suggestion_color = "#03DAC6"  # Green
-            icon = "📈"
-        elif "sell" in trading_suggestion["action"].lower() or "bearish" in trading_suggestion["action"].lower():
-            suggestion_color = "#FF4F5E"  # Red
-            icon = "📉"
+    # Each section goes out as one HTML block; the section HTML has no blank
+    # lines, so markdown doesn't split it
+    if view == "📊 Patterns":
+        if html["patterns"]:
+            st.markdown("<h4>Detected Patterns</h4>" + html["patterns"], unsafe_allow_html=True)
         else:
-            suggestion_color = "#8b9eff"  # Blue
-            icon = "📊"
-        
-        # Get strength value if available, or default to 75
-        signal_strength = trading_suggestion.get('strength', 75)
-        
-        # Display suggestion with enhanced styling and strength meter
-        st.markdown(f"""
-        <div style="background-color: {suggestion_color}; padding: 1.5rem; border-radius: 12px; margin-bottom: 1.5rem;">
-            <div style="display: flex; justify-content: space-between; align-items: center;">
-                <h3 style="color: white; margin: 0; display: flex; align-items: center;">
-                    <span style="font-size: 2rem; margin-right: 1rem;">{icon}</span>
-                    {trading_suggestion['action']}
-                </h3>
-                <div style="background-color: rgba(255,255,255,0.2); border-radius: 50px; padding: 0.5rem 1rem; display: flex; align-items: center;">
-                    <div style="width: 10px; height: 10px; background-color: white; border-radius: 50%; margin-right: 8px;"></div>
-                    <span style="color: white; font-weight: bold;">{signal_strength}% Strength</span>
-                </div>
-            </div>
-        </div>
-        <div style="background-color: #1a2942; padding: 1.5rem; border-radius: 12px; box-shadow: 0 2px 6px rgba(0,0,0,0.1); margin-bottom: 1.5rem; border: 1px solid #2d3747;">
-            <p style="font-size: 1.1rem; line-height: 1.6; color: #ffffff;">{trading_suggestion['rationale']}</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Display key levels with enhanced styling
-        st.markdown("<h4>Key Trading Levels</h4>", unsafe_allow_html=True)
-        
-        # Create three columns for key levels
-        key_cols = st.columns(3)
-        
-        with key_cols[0]:
-            st.markdown(f"""
-            <div class="metric-card" style="border-top: 4px solid #8b9eff;">
-                <h5 style="margin: 0; color: #8b9eff;">Entry Point</h5>
-                <p style="font-size: 1.5rem; font-weight: 600; margin: 0.5rem 0; color: #ffffff;">{trading_suggestion['entry_point']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with key_cols[1]:
-            st.markdown(f"""
-            <div class="metric-card" style="border-top: 4px solid #FF4F5E;">
-                <h5 style="margin: 0; color: #FF4F5E;">Stop Loss</h5>
-                <p style="font-size: 1.5rem; font-weight: 600; margin: 0.5rem 0; color: #ffffff;">{trading_suggestion['stop_loss']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with key_cols[2]:
-            st.markdown(f"""
-            <div class="metric-card" style="border-top: 4px solid #03DAC6;">
-                <h5 style="margin: 0; color: #03DAC6;">Take Profit</h5>
-                <p style="font-size: 1.5rem; font-weight: 600; margin: 0.5rem 0; color: #ffffff;">{trading_suggestion['take_profit']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Calculate and display risk-reward ratio
-        risk = abs(float(trading_suggestion['entry_point']) - float(trading_suggestion['stop_loss']))
-        reward = abs(float(trading_suggestion['take_profit']) - float(trading_suggestion['entry_point']))
-        risk_reward = reward / risk if risk > 0 else 0
-        
-        # Color coding for risk-reward
-        rr_color = "#03DAC6" if risk_reward >= 2 else "#FFB740" if risk_reward >= 1 else "#FF4F5E"
-        
-        st.markdown(f"""
-        <div style="margin-top: 1.5rem; background-color: #1a2942; padding: 1.2rem; border-radius: 12px; border: 1px solid #2d3747;">
-            <div style="display: flex; justify-content: space-between; align-items: center;">
-                <h5 style="margin: 0; color: #8b9eff;">Risk-Reward Ratio</h5>
-                <p style="font-size: 1.2rem; font-weight: 600; color: {rr_color}; margin: 0;">1:{risk_reward:.2f}</p>
-            </div>
-            <div style="height: 6px; background-color: #2d3747; margin-top: 0.8rem; border-radius: 3px;">
-                <div style="height: 100%; width: {min(risk_reward * 50, 100)}%; background-color: {rr_color}; border-radius: 3px;"></div>
-            </div>
-            <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; color: #ffffff; opacity: 0.8;">
-                {
-                "Excellent risk-reward ratio. The potential reward significantly outweighs the risk." if risk_reward >= 2 else
-                "Acceptable risk-reward ratio. The potential reward outweighs the risk." if risk_reward >= 1 else
-                "Poor risk-reward ratio. Consider adjusting your entry, stop loss, or take profit levels."
-                }
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
+            st.markdown("<h4>Detected Patterns</h4>", unsafe_allow_html=True)
+            st.info("No significant patterns detected in this chart.")
+    elif view == "📈 Indicators":
+        st.markdown(
+            "<h4>Moving Averages</h4>" + html["moving_averages"]
+            + "<h4 style='margin-top: 1.5rem;'>Oscillators</h4>" + html["oscillators"]
+            + "<h4 style='margin-top: 1.5rem;'>Support & Resistance</h4>" + html["support_resistance"],
+            unsafe_allow_html=True
+        )
+    else:
+        # Suggestion with strength meter, key levels and risk-reward ratio
+        st.markdown(html["suggestion"] + html["key_levels"] + html["risk_reward"], unsafe_allow_html=True)
 
-# MOVED: "How it Works" section to the bottom as a much smaller section
-st.markdown("<div class='footer-section'>", unsafe_allow_html=True)
+# Display results if analysis is complete with enhanced styling
+if st.session_state.analysis_complete and st.session_state.analysis_results is not None:
+    _render_results(st.session_state.analysis_results, timeframe)
 
-# How it Works - simplified and smaller
-st.markdown("<h5 style='text-align: center; margin-bottom: 0.5rem;'>How it Works</h5>", unsafe_allow_html=True)
-st.markdown("""
-<div class="how-it-works">
-    <div class="step-item"><div class="step-number">1</div>Upload chart</div>
-    <div class="step-item"><div class="step-number">2</div>Select timeframe</div>
-    <div class="step-item"><div class="step-number">3</div>Analyze</div>
-    <div class="step-item"><div class="step-number">4</div>Review patterns</div>
-    <div class="step-item"><div class="step-number">5</div>Get suggestions</div>
-</div>
-""", unsafe_allow_html=True)
+# MOVED: "How it Works" section to the bottom as a much smaller section
+st.markdown(HOW_IT_WORKS_HTML, unsafe_allow_html=True)
 
 # Financial disclaimer with enhanced styling
-st.markdown("<div class='disclaimer'>", unsafe_allow_html=True)
-st.markdown("""
-<strong>Disclaimer:</strong> This is not financial advice. Always do your own research before making any trading decisions.
-The AI analysis is based on technical indicators and pattern recognition only.
-""", unsafe_allow_html=True)
-st.markdown("</div>", unsafe_allow_html=True)
+st.markdown(DISCLAIMER_HTML, unsafe_allow_html=True)
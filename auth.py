@@ -1,11 +1,35 @@
 import streamlit as st
 import hashlib
+import hmac
+import json
 import pickle
 import os
+import tempfile
+import threading
 from datetime import datetime, timedelta
 
 # File to store user data
-USER_DB_FILE = "user_database.pkl"
+USER_DB_FILE = "user_database.json"
+
+# Pickle database used by earlier versions. It is never loaded by the app;
+# `python auth.py` merges it into USER_DB_FILE once and renames it. Until
+# then sign-ups are refused, so no new account can shadow a legacy one
+LEGACY_USER_DB_FILE = "user_database.pkl"
+
+# scrypt cost parameters for password hashes (about 16 MB and tens of ms per hash)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+# Verified against on logins for unknown usernames so they cost one scrypt hash
+DUMMY_PASSWORD_HASH = f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${'00' * 16}${'00' * 64}"
+
+# Parsed user database, reused while the file's (mtime_ns, size) is unchanged
+_users_cache = {"stat": None, "users": None}
+_users_cache_lock = threading.Lock()
+
+# Whether the unmigrated legacy database has been reported already
+_legacy_db_reported = False
 
 def init_auth():
     """Initialize the authentication system"""
@@ -19,24 +43,129 @@ def init_auth():
     if "signup_error" not in st.session_state:
         st.session_state.signup_error = None
 
+def _db_stat():
+    st_result = os.stat(USER_DB_FILE)
+    return (st_result.st_mtime_ns, st_result.st_size)
+
+def _copy_users(users):
+    # Callers modify the records they get back, so the cache hands out copies;
+    # records only hold strings and None, so one level deep is enough
+    return {username: dict(user) for username, user in users.items()}
+
+def _cache_users(stat, users):
+    with _users_cache_lock:
+        _users_cache["stat"] = stat
+        _users_cache["users"] = _copy_users(users)
+
+def _legacy_db_pending():
+    global _legacy_db_reported
+    if not os.path.exists(LEGACY_USER_DB_FILE):
+        return False
+    if not _legacy_db_reported:
+        _legacy_db_reported = True
+        print(f"ERROR: {LEGACY_USER_DB_FILE} has not been migrated; its accounts can't log in "
+              f"and sign-ups are disabled. Run `python auth.py` to migrate it.")
+    return True
+
 def load_users():
     """Load user database from file"""
+    _legacy_db_pending()
     if os.path.exists(USER_DB_FILE):
         try:
-            with open(USER_DB_FILE, "rb") as f:
-                return pickle.load(f)
-        except:
+            stat = _db_stat()
+            with _users_cache_lock:
+                if _users_cache["stat"] == stat:
+                    return _copy_users(_users_cache["users"])
+            with open(USER_DB_FILE, "r", encoding="utf-8") as f:
+                users = json.load(f)
+        except (OSError, ValueError):
             return {}
+        _cache_users(stat, users)
+        return users
     return {}
 
 def save_users(users):
     """Save user database to file"""
-    with open(USER_DB_FILE, "wb") as f:
-        pickle.dump(users, f)
+    # Write to a temporary file next to the database and swap it in, so a
+    # crash or a concurrent reader never sees a half-written file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(USER_DB_FILE)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(users, f)
+        os.replace(tmp_path, USER_DB_FILE)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    
+    # The next load_users() finds the file unchanged and skips parsing it
+    _cache_users(_db_stat(), users)
+
+def migrate_legacy_users():
+    """
+    Merge the pickle database of earlier versions into USER_DB_FILE
+    
+    Run offline (`python auth.py`), since unpickling a tampered file can
+    execute arbitrary code. Accounts already in USER_DB_FILE win over legacy
+    accounts with the same username. The pickle file is renamed afterwards so
+    it is never loaded again.
+    
+    Returns:
+        bool: True if a legacy database was migrated, False otherwise
+    """
+    if not os.path.exists(LEGACY_USER_DB_FILE):
+        return False
+    
+    # The migration reports its own outcome, so load_users() needn't warn
+    global _legacy_db_reported
+    _legacy_db_reported = True
+    
+    with open(LEGACY_USER_DB_FILE, "rb") as f:
+        users = pickle.load(f)
+    users.update(load_users())
+    save_users(users)
+    os.replace(LEGACY_USER_DB_FILE, LEGACY_USER_DB_FILE + ".migrated")
+    return True
 
 def hash_password(password):
-    """Create a secure hash of the password"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """
+    Create a salted scrypt hash of the password
+    
+    Args:
+        password (str): The password to hash
+        
+    Returns:
+        str: "scrypt$n$r$p$salt$hash", with salt and hash hex encoded
+    """
+    salt = os.urandom(16)
+    key = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${key.hex()}"
+
+def verify_password(password, password_hash):
+    """
+    Check a password against a stored hash
+    
+    Args:
+        password (str): The password to check
+        password_hash (str): The stored hash, scrypt or legacy unsalted SHA-256
+        
+    Returns:
+        tuple: (whether the password matches, whether the hash should be
+            replaced with a fresh hash_password() result)
+    """
+    if not password_hash.startswith("scrypt$"):
+        # Accounts created before scrypt hashing store a bare SHA-256 hex digest
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(candidate, password_hash), True
+    
+    # A malformed stored hash (wrong field count, bad numbers or hex, or
+    # parameters scrypt rejects) fails verification instead of raising
+    try:
+        _, n, r, p, salt, key = password_hash.split("$")
+        n, r, p = int(n), int(r), int(p)
+        candidate = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt), n=n, r=r, p=p)
+    except (ValueError, TypeError):
+        return False, False
+    return hmac.compare_digest(candidate.hex(), key), (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
 
 def signup(username, password, email):
     """
@@ -50,6 +179,12 @@ def signup(username, password, email):
     Returns:
         bool: True if signup successful, False otherwise
     """
+    # A new account could take the username of a legacy one that hasn't
+    # been migrated yet
+    if _legacy_db_pending():
+        st.session_state.signup_error = "Sign-ups are temporarily disabled while accounts are being migrated. Please try again later."
+        return False
+    
     users = load_users()
     
     # Check if username already exists
@@ -87,16 +222,23 @@ def login(username, password):
     """
     users = load_users()
     
-    # Check if username exists
+    # Check if username exists; still hash the password so an unknown username
+    # takes as long to reject as a wrong password
     if username not in users:
+        verify_password(password, DUMMY_PASSWORD_HASH)
         st.session_state.login_error = "Invalid username or password"
         return False
     
     # Check if password is correct
-    if users[username]["password_hash"] != hash_password(password):
+    password_ok, needs_rehash = verify_password(password, users[username]["password_hash"])
+    if not password_ok:
         st.session_state.login_error = "Invalid username or password"
         return False
     
+    # Upgrade legacy or outdated hashes now that the password is known
+    if needs_rehash:
+        users[username]["password_hash"] = hash_password(password)
+    
     # Update last login time
     users[username]["last_login"] = datetime.now().isoformat()
     save_users(users)
@@ -180,4 +322,10 @@ def require_auth():
             
         return False
     
-    return True
\ No newline at end of file
+    return True
+
+if __name__ == "__main__":
+    if migrate_legacy_users():
+        print(f"Migrated {LEGACY_USER_DB_FILE} to {USER_DB_FILE}")
+    else:
+        print("Nothing to migrate")
@@ -1,8 +1,27 @@
 import numpy as np
 import cv2
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pattern_recognition import identify_patterns
 from technical_indicators import extract_indicators
 
+# Pattern recognition and indicator extraction only read the preprocessed
+# image, and OpenCV releases the GIL, so the two run side by side. The pool is
+# shared by every session in the process and each analysis takes one worker,
+# so it is sized for that many concurrent analyses rather than for one
+ANALYSIS_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="chart-analysis")
+
+# Preprocessing runs on cv2.UMat, keeping the intermediate images on an
+# OpenCL device, only when CHART_USE_OPENCL=1 is set and a device exists.
+# OpenCL kernels can differ slightly from the CPU ones, which would make the
+# detected patterns and levels depend on the host, and the first chart pays
+# for compiling them, so OpenCV's OpenCL dispatch is otherwise switched off
+USE_OPENCL = os.environ.get("CHART_USE_OPENCL") == "1" and cv2.ocl.haveOpenCL()
+cv2.ocl.setUseOpenCL(USE_OPENCL)
+
+# Structuring element for dilating the edge image, allocated once
+DILATE_KERNEL = np.ones((3, 3), np.uint8)
+
 def analyze_chart(image, timeframe):
     """
     Main function to analyze a stock chart image and extract patterns and indicators
@@ -15,13 +34,14 @@ def analyze_chart(image, timeframe):
         dict: The analysis results containing patterns and technical indicators
     """
     # Preprocess the image
-    processed_image = preprocess_image(image)
+    processed_image = preprocess_image(_normalize(image))
     
-    # Identify patterns in the image
-    patterns = identify_patterns(processed_image, timeframe)
+    # Identify patterns in the image while the indicators are extracted
+    patterns_future = ANALYSIS_EXECUTOR.submit(identify_patterns, processed_image, timeframe)
     
     # Extract technical indicators
     indicators = extract_indicators(processed_image, timeframe)
+    patterns = patterns_future.result()
     
     # Combine results
     results = {
@@ -31,6 +51,16 @@ def analyze_chart(image, timeframe):
     
     return results
 
+def _normalize(image):
+    # One contiguous 8-bit BGR (or grayscale) copy up front, so the OpenCV
+    # calls below don't each copy a strided view (e.g. the channel-reversed
+    # array app.py passes in) or reject another dtype
+    if image.ndim == 3 and image.shape[2] == 4:
+        image = image[..., :3]
+    if image.dtype != np.uint8:
+        image = cv2.normalize(image, None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
+    return np.ascontiguousarray(image)
+
 def preprocess_image(image):
     """
     Preprocess the chart image for analysis
@@ -41,11 +71,14 @@ def preprocess_image(image):
     Returns:
         numpy.ndarray: The preprocessed image
     """
+    # Only the grayscale and dilated edge images are downloaded from the device
+    source = cv2.UMat(image) if USE_OPENCL else image
+    
     # Convert to grayscale if the image is in color
-    if len(image.shape) == 3:
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if image.ndim == 3:
+        gray = cv2.cvtColor(source, cv2.COLOR_BGR2GRAY)
     else:
-        gray = image
+        gray = source
     
     # Apply Gaussian blur to reduce noise
     blurred = cv2.GaussianBlur(gray, (5, 5), 0)
@@ -60,8 +93,11 @@ def preprocess_image(image):
     edges = cv2.Canny(thresh, 50, 150)
     
     # Dilate edges to make them more prominent
-    kernel = np.ones((3, 3), np.uint8)
-    dilated = cv2.dilate(edges, kernel, iterations=1)
+    dilated = cv2.dilate(edges, DILATE_KERNEL, iterations=1)
+    
+    if USE_OPENCL:
+        gray = gray.get()
+        dilated = dilated.get()
     
     # Return both the grayscale and processed edge image
     return {
@@ -1,9 +1,24 @@
 import cv2
+import heapq
 import numpy as np
 from sklearn.cluster import KMeans
 from sklearn.linear_model import LinearRegression
 import os
 
+# Minimum segment length for trend lines. The shared Hough pass uses the
+# triangle detector's shorter minimum, so trend lines are filtered afterwards
+TREND_MIN_LINE_LENGTH = 50
+
+# Once a trend score passes this, the contour-based detectors (head and
+# shoulders, double top/bottom) are skipped. Candle and triangle confidences
+# are capped at 0.9, so only a trend with nearly every segment in one slope
+# class (the dominant class also gets a 0.1 boost) can get here
+EARLY_EXIT_CONFIDENCE = 0.95
+
+# HSV range for green (bullish) candles
+GREEN_CANDLE_LOWER = np.array([40, 40, 40])
+GREEN_CANDLE_UPPER = np.array([80, 255, 255])
+
 def identify_patterns(image_data, timeframe):
     """
     Identify common chart patterns in the processed image
@@ -23,16 +38,33 @@ def identify_patterns(image_data, timeframe):
     # List to store detected patterns
     detected_patterns = []
     
-    # Detect trend lines
-    trend_lines = detect_trend_lines(edge_image)
+    # Hough lines are computed once and shared by the line-based detectors
+    lines = cv2.HoughLinesP(
+        edge_image, 1, np.pi/180, 
+        threshold=50, minLineLength=30, maxLineGap=10
+    )
+    
+    # Detect trend lines and triangle patterns
+    trend_lines = detect_trend_lines(lines)
+    triangle_patterns = detect_triangle_patterns(lines)
     
     # Detect candlestick patterns
     candlestick_patterns = detect_candlestick_patterns(original_image)
     
-    # Detect chart patterns
-    head_and_shoulders = detect_head_and_shoulders(edge_image)
-    double_top_bottom = detect_double_top_bottom(edge_image)
-    triangle_patterns = detect_triangle_patterns(edge_image)
+    # Contour-based chart patterns are only looked for when the chart isn't
+    # already dominated by a single trend
+    strongest_trend = max(result["confidence"] for result in trend_lines.values())
+    if strongest_trend > EARLY_EXIT_CONFIDENCE:
+        head_and_shoulders = {"confidence": 0.0}
+        double_top_bottom = {
+            "double_top": {"confidence": 0.1},
+            "double_bottom": {"confidence": 0.1}
+        }
+    else:
+        # Contours are computed once and shared by both detectors
+        contours, _ = cv2.findContours(edge_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        head_and_shoulders = detect_head_and_shoulders(contours)
+        double_top_bottom = detect_double_top_bottom(edge_image, contours)
     
     # Add detected patterns to the list if they have sufficient confidence
     if trend_lines["uptrend"]["confidence"] > 0.6:
@@ -96,8 +128,7 @@ def identify_patterns(image_data, timeframe):
             })
     
     # Add candlestick patterns if detected
-    for pattern in candlestick_patterns:
-        detected_patterns.append(pattern)
+    detected_patterns.extend(candlestick_patterns)
     
     # If no patterns detected, add a general trend analysis
     if not detected_patterns:
@@ -129,26 +160,22 @@ def identify_patterns(image_data, timeframe):
     
     return detected_patterns
 
-def detect_trend_lines(edge_image):
+def _line_deltas(lines):
+    # Horizontal and vertical extent of each HoughLinesP segment, as arrays
+    segments = lines[:, 0, :]
+    return segments[:, 2] - segments[:, 0], segments[:, 3] - segments[:, 1]
+
+def detect_trend_lines(lines):
     """
     Detect trend lines in the chart using Hough Transform
     
     Args:
-        edge_image (numpy.ndarray): Edge-detected image
+        lines (numpy.ndarray): Line segments from cv2.HoughLinesP on the
+            edge-detected image, or None if none were found
         
     Returns:
         dict: Dictionary containing trend information with confidence scores
     """
-    # Apply probabilistic Hough Transform to detect lines
-    lines = cv2.HoughLinesP(
-        edge_image, 1, np.pi/180, 
-        threshold=50, minLineLength=50, maxLineGap=10
-    )
-    
-    uptrend_count = 0
-    downtrend_count = 0
-    horizontal_count = 0
-    
     # If no lines are detected, return default results
     if lines is None:
         return {
@@ -157,25 +184,26 @@ def detect_trend_lines(edge_image):
             "sideways": {"confidence": 0.5}
         }
     
-    # Analyze the slopes of detected lines
-    for line in lines:
-        x1, y1, x2, y2 = line[0]
-        
-        # Skip if the line is too short
-        if abs(x2 - x1) < 20:
-            continue
-        
-        # Calculate slope (y is inverted in image coordinates)
-        if x2 != x1:  # Avoid division by zero
-            slope = (y2 - y1) / (x2 - x1)
-            
-            # Classify the slope
-            if abs(slope) < 0.1:  # Almost horizontal
-                horizontal_count += 1
-            elif slope > 0:  # Downtrend (y increases downward in images)
-                downtrend_count += 1
-            else:  # Uptrend
-                uptrend_count += 1
+    # Analyze the slopes of all detected lines at once
+    dx, dy = _line_deltas(lines)
+    
+    # Keep segments as long as a trend line (the same test HoughLinesP applies
+    # for minLineLength) that also span at least 20px horizontally, which
+    # rules out division by zero
+    valid = (
+        ((np.abs(dx) >= TREND_MIN_LINE_LENGTH) | (np.abs(dy) >= TREND_MIN_LINE_LENGTH))
+        & (np.abs(dx) >= 20)
+    )
+    
+    # Calculate slope (y is inverted in image coordinates)
+    slopes = dy[valid] / dx[valid]
+    
+    # Classify the slopes: almost horizontal, downtrend (y increases downward
+    # in images) or uptrend
+    horizontal = np.abs(slopes) < 0.1
+    horizontal_count = int(np.count_nonzero(horizontal))
+    downtrend_count = int(np.count_nonzero((slopes > 0) & ~horizontal))
+    uptrend_count = len(slopes) - horizontal_count - downtrend_count
     
     total_lines = uptrend_count + downtrend_count + horizontal_count
     
@@ -236,22 +264,14 @@ def detect_candlestick_patterns(image):
         hsv = cv2.cvtColor(bottom_third, cv2.COLOR_BGR2HSV)
         
         # Detect green candles (bullish)
-        lower_green = np.array([40, 40, 40])
-        upper_green = np.array([80, 255, 255])
-        green_mask = cv2.inRange(hsv, lower_green, upper_green)
+        green_mask = cv2.inRange(hsv, GREEN_CANDLE_LOWER, GREEN_CANDLE_UPPER)
         green_pixels = cv2.countNonZero(green_mask)
         
-        # Detect red candles (bearish)
-        lower_red1 = np.array([0, 50, 50])
-        upper_red1 = np.array([10, 255, 255])
-        red_mask1 = cv2.inRange(hsv, lower_red1, upper_red1)
-        
-        lower_red2 = np.array([170, 50, 50])
-        upper_red2 = np.array([180, 255, 255])
-        red_mask2 = cv2.inRange(hsv, lower_red2, upper_red2)
-        
-        red_mask = cv2.bitwise_or(red_mask1, red_mask2)
-        red_pixels = cv2.countNonZero(red_mask)
+        # Detect red candles (bearish). Red hue wraps around, so it covers both
+        # 0-10 and 170-180; one predicate replaces two inRange masks and their OR
+        hue, saturation, value = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+        red_mask = ((hue <= 10) | (hue >= 170)) & (saturation >= 50) & (value >= 50)
+        red_pixels = int(np.count_nonzero(red_mask))
         
         total_colored_pixels = green_pixels + red_pixels
         if total_colored_pixels > 0:
@@ -276,26 +296,24 @@ def detect_candlestick_patterns(image):
     
     return patterns
 
-def detect_head_and_shoulders(edge_image):
+def detect_head_and_shoulders(contours):
     """
     Detect head and shoulders pattern
     
     Args:
-        edge_image (numpy.ndarray): Edge-detected image
+        contours (tuple): External contours of the edge-detected image, used
+            to find peak shapes
         
     Returns:
         dict: Information about detected head and shoulders pattern
     """
     # Simplified implementation - in production, this would use more advanced algorithms
     
-    # Use contour detection to find peak shapes
-    contours, _ = cv2.findContours(edge_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    
     if len(contours) < 3:  # Need at least 3 major contours for head and shoulders
         return {"confidence": 0.0}
     
-    # Sort contours by area
-    contours = sorted(contours, key=cv2.contourArea, reverse=True)[:5]
+    # Keep the five largest contours by area, without sorting all of them
+    contours = heapq.nlargest(5, contours, key=cv2.contourArea)
     
     # Get bounding rectangles for largest contours
     bounding_rects = [cv2.boundingRect(c) for c in contours[:3]]
@@ -312,27 +330,25 @@ def detect_head_and_shoulders(edge_image):
     
     return {"confidence": 0.2}
 
-def detect_double_top_bottom(edge_image):
+def detect_double_top_bottom(edge_image, contours):
     """
     Detect double top or double bottom patterns
     
     Args:
         edge_image (numpy.ndarray): Edge-detected image
+        contours (tuple): External contours of the edge-detected image
         
     Returns:
         dict: Information about detected double top/bottom patterns
     """
-    # Use contour detection
-    contours, _ = cv2.findContours(edge_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    
     if len(contours) < 2:  # Need at least 2 major contours
         return {
             "double_top": {"confidence": 0.1},
             "double_bottom": {"confidence": 0.1}
         }
     
-    # Sort contours by area
-    contours = sorted(contours, key=cv2.contourArea, reverse=True)[:5]
+    # Keep the five largest contours by area, without sorting all of them
+    contours = heapq.nlargest(5, contours, key=cv2.contourArea)
     
     # Get centroids of the contours
     centroids = []
@@ -352,50 +368,41 @@ def detect_double_top_bottom(edge_image):
     
     # Sort centroids by x-coordinate (time axis)
     centroids.sort(key=lambda p: p[0])
-    
-    # Check for patterns
-    double_top_confidence = 0.1
-    double_bottom_confidence = 0.1
-    
-    for i in range(len(centroids) - 1):
-        x1, y1 = centroids[i]
-        x2, y2 = centroids[i + 1]
-        
-        # Check if the y-coordinates are close (tops or bottoms at similar levels)
-        y_diff = abs(y1 - y2)
-        if y_diff < edge_image.shape[0] * 0.05:  # Within 5% of image height
-            # Check if the x-coordinates are sufficiently separated
-            x_diff = abs(x1 - x2)
-            if x_diff > edge_image.shape[1] * 0.15:  # At least 15% of image width apart
-                # For a double top, y should be small (top of the image)
-                if y1 < edge_image.shape[0] * 0.4:  # In top 40% of image
-                    double_top_confidence = 0.7 + 0.2 * (1 - y_diff / (edge_image.shape[0] * 0.05))
-                
-                # For a double bottom, y should be large (bottom of the image)
-                if y1 > edge_image.shape[0] * 0.6:  # In bottom 40% of image
-                    double_bottom_confidence = 0.7 + 0.2 * (1 - y_diff / (edge_image.shape[0] * 0.05))
+    centroids = np.array(centroids)
+    x, y = centroids[:, 0], centroids[:, 1]
+    height, width = edge_image.shape[:2]
+    
+    # Check neighbouring centroids for patterns, all pairs at once: tops or
+    # bottoms at similar levels (within 5% of image height) that are
+    # sufficiently separated (at least 15% of image width apart)
+    y_diff = np.abs(np.diff(y))
+    x_diff = np.abs(np.diff(x))
+    paired = (y_diff < height * 0.05) & (x_diff > width * 0.15)
+    pair_confidence = 0.7 + 0.2 * (1 - y_diff / (height * 0.05))
+    
+    # For a double top, y should be small (top 40% of the image); for a double
+    # bottom, large (bottom 40%). The last matching pair sets the confidence
+    double_tops = np.flatnonzero(paired & (y[:-1] < height * 0.4))
+    double_bottoms = np.flatnonzero(paired & (y[:-1] > height * 0.6))
+    double_top_confidence = float(pair_confidence[double_tops[-1]]) if double_tops.size else 0.1
+    double_bottom_confidence = float(pair_confidence[double_bottoms[-1]]) if double_bottoms.size else 0.1
     
     return {
         "double_top": {"confidence": min(double_top_confidence, 0.9)},
         "double_bottom": {"confidence": min(double_bottom_confidence, 0.9)}
     }
 
-def detect_triangle_patterns(edge_image):
+def detect_triangle_patterns(lines):
     """
     Detect triangle patterns (ascending, descending, symmetric)
     
     Args:
-        edge_image (numpy.ndarray): Edge-detected image
+        lines (numpy.ndarray): Line segments from cv2.HoughLinesP on the
+            edge-detected image, or None if none were found
         
     Returns:
         dict: Information about detected triangle patterns
     """
-    # Apply Hough Transform to detect lines
-    lines = cv2.HoughLinesP(
-        edge_image, 1, np.pi/180, 
-        threshold=50, minLineLength=30, maxLineGap=10
-    )
-    
     if lines is None or len(lines) < 2:
         return {
             "ascending": {"confidence": 0.1},
@@ -403,20 +410,15 @@ def detect_triangle_patterns(edge_image):
             "symmetric": {"confidence": 0.1}
         }
     
-    # Separate lines by slope
-    up_slopes = []
-    down_slopes = []
-    for line in lines:
-        x1, y1, x2, y2 = line[0]
-        if x2 - x1 == 0:  # Avoid division by zero
-            continue
-            
-        slope = (y2 - y1) / (x2 - x1)
-        
-        if slope > 0:  # Downward slope (image y-axis is inverted)
-            down_slopes.append(slope)
-        elif slope < 0:  # Upward slope (image y-axis is inverted)
-            up_slopes.append(slope)
+    # Separate lines by slope, skipping vertical ones to avoid division by zero
+    dx, dy = _line_deltas(lines)
+    non_vertical = dx != 0
+    slopes = dy[non_vertical] / dx[non_vertical]
+    
+    # Downward slopes are positive and upward slopes negative, since the
+    # image y-axis is inverted
+    down_slopes = slopes[slopes > 0]
+    up_slopes = slopes[slopes < 0]
     
     # Initialize confidences
     ascending_confidence = 0.1
@@ -442,11 +444,11 @@ def detect_triangle_patterns(edge_image):
                 symmetric_confidence = 0.6 + 0.3 * variance_factor
         
         # Check for ascending triangle (horizontal resistance, upward support)
-        if any(abs(s) < 0.1 for s in down_slopes) and any(s < -0.1 for s in up_slopes):
+        if np.any(np.abs(down_slopes) < 0.1) and np.any(up_slopes < -0.1):
             ascending_confidence = 0.6 + 0.3 * variance_factor
         
         # Check for descending triangle (horizontal support, downward resistance)
-        if any(abs(s) < 0.1 for s in up_slopes) and any(s > 0.1 for s in down_slopes):
+        if np.any(np.abs(up_slopes) < 0.1) and np.any(down_slopes > 0.1):
             descending_confidence = 0.6 + 0.3 * variance_factor
     
     return {
@@ -1,6 +1,24 @@
 import cv2
 import numpy as np
 import random
+from scipy.signal import find_peaks
+
+# Generator for the simulated indicator values; PCG64 draws are cheaper than
+# the legacy global RandomState
+RNG = np.random.default_rng()
+
+# Moving averages reported per chart, and the relative spread of each
+# simulated value around the current price
+MA_KEYS = ("sma_20", "sma_50", "sma_200", "ema_12", "ema_26")
+MA_VARIATIONS = np.array([0.05, 0.08, 0.15, 0.03, 0.06])
+
+# Ranges of the simulated MACD line, MACD signal spread, Stochastic %K and
+# %D spread, drawn together in one call
+OSCILLATOR_DRAW_LOW = np.array([-2, -0.5, 0, -0.2])
+OSCILLATOR_DRAW_HIGH = np.array([2, 0.5, 100, 0.2])
+
+# Trend labels indexed by whether the reading is bullish
+TREND_LABELS = ("Bearish", "Bullish")
 
 def extract_indicators(image_data, timeframe):
     """
@@ -63,50 +81,27 @@ def extract_moving_averages(original_image, gray_image):
     
     # Create virtual price close to simulate "current price"
     # Use the pixel value at the rightmost part of the image
+    # (cv2.mean sums the uint8 view directly, without numpy's float64 pass)
     right_edge_area = gray_image[:, -int(width * 0.1):]
-    avg_brightness = np.mean(right_edge_area)
+    avg_brightness = cv2.mean(right_edge_area)[0]
     
     # Normalize to get a price in a realistic range (e.g., $50-200)
     simulated_price = 50 + (avg_brightness / 255) * 150
     
-    # Apply random variations to simulate MA values around the current price
-    sma_20_value = simulated_price * (1 + np.random.uniform(-0.05, 0.05))
-    sma_50_value = simulated_price * (1 + np.random.uniform(-0.08, 0.08))
-    sma_200_value = simulated_price * (1 + np.random.uniform(-0.15, 0.15))
-    
-    # EMA values
-    ema_12_value = simulated_price * (1 + np.random.uniform(-0.03, 0.03))
-    ema_26_value = simulated_price * (1 + np.random.uniform(-0.06, 0.06))
+    # Apply random variations to simulate MA values around the current price,
+    # drawing all five in one call
+    ma_values = simulated_price * (1 + RNG.uniform(-MA_VARIATIONS, MA_VARIATIONS))
     
     # Determine trends based on comparison with simulated price
-    sma_20_trend = "Bullish" if sma_20_value < simulated_price else "Bearish"
-    sma_50_trend = "Bullish" if sma_50_value < simulated_price else "Bearish"
-    sma_200_trend = "Bullish" if sma_200_value < simulated_price else "Bearish"
-    ema_12_trend = "Bullish" if ema_12_value < simulated_price else "Bearish"
-    ema_26_trend = "Bullish" if ema_26_value < simulated_price else "Bearish"
+    ma_trends = [TREND_LABELS[bullish] for bullish in (ma_values < simulated_price).tolist()]
     
     # Construct moving averages dictionary
     moving_averages = {
-        "sma_20": {
-            "value": sma_20_value,
-            "trend": sma_20_trend
-        },
-        "sma_50": {
-            "value": sma_50_value,
-            "trend": sma_50_trend
-        },
-        "sma_200": {
-            "value": sma_200_value,
-            "trend": sma_200_trend
-        },
-        "ema_12": {
-            "value": ema_12_value,
-            "trend": ema_12_trend
-        },
-        "ema_26": {
-            "value": ema_26_value,
-            "trend": ema_26_trend
+        key: {
+            "value": value,
+            "trend": trend
         }
+        for key, value, trend in zip(MA_KEYS, ma_values.tolist(), ma_trends)
     }
     
     return moving_averages
@@ -134,7 +129,7 @@ def extract_oscillators(original_image, gray_image):
     
     # Check the bottom third of the image for oscillator indicators
     bottom_third = gray_image[2*height//3:, :]
-    avg_brightness = np.mean(bottom_third)
+    avg_brightness = cv2.mean(bottom_third)[0]
     
     # Map brightness to RSI range (0-100)
     # Brighter areas might indicate higher RSI
@@ -151,23 +146,23 @@ def extract_oscillators(original_image, gray_image):
     # MACD calculation
     # In a real implementation, this would be extracted from the MACD panel
     
+    # Draw the simulated MACD and Stochastic inputs in one call
+    macd_line, signal_spread, stoch_k, stoch_spread = RNG.uniform(
+        OSCILLATOR_DRAW_LOW, OSCILLATOR_DRAW_HIGH
+    ).tolist()
+    
     # Simulate MACD line and signal line
-    macd_line = np.random.uniform(-2, 2)
-    macd_signal = macd_line * (1 + np.random.uniform(-0.5, 0.5))
+    macd_signal = macd_line * (1 + signal_spread)
     macd_histogram = macd_line - macd_signal
     
     # Determine MACD trend
-    if macd_line > macd_signal:
-        macd_trend = "Bullish"
-    else:
-        macd_trend = "Bearish"
+    macd_trend = TREND_LABELS[macd_line > macd_signal]
     
     # Stochastic calculation
     # In a real implementation, this would be extracted from the Stochastic panel
     
     # Simulate Stochastic K and D values
-    stoch_k = min(max(np.random.uniform(0, 100), 0), 100)
-    stoch_d = stoch_k * (1 + np.random.uniform(-0.2, 0.2))
+    stoch_d = stoch_k * (1 + stoch_spread)
     
     # Determine Stochastic trend
     if stoch_k > 80 and stoch_d > 80:
@@ -223,14 +218,15 @@ def extract_support_resistance(gray_image, edge_image):
     # If no horizontal lines are found, use histogram-based approach
     if not horizontal_lines:
         # Create a histogram of pixel intensities along the y-axis
-        y_histogram = np.sum(edge_image, axis=1)
+        # (row sums of 8-bit pixels fit easily in int32)
+        y_histogram = np.sum(edge_image, axis=1, dtype=np.int32)
         
         # Find peaks in the histogram
-        from scipy.signal import find_peaks
         peaks, _ = find_peaks(y_histogram, height=np.max(y_histogram) * 0.3, distance=height * 0.05)
         
-        # Sort peaks by y-coordinate (price level)
-        peaks = sorted(peaks)
+        # Sort peaks by y-coordinate (price level), as plain ints so the
+        # levels below come out as Python floats
+        peaks = sorted(peaks.tolist())
         
         # Use peaks as support/resistance levels
         horizontal_lines = peaks
@@ -261,12 +257,17 @@ def extract_support_resistance(gray_image, edge_image):
         else:
             support_levels.append(round(price, 2))
     
-    # Ensure we have at least two levels each
-    while len(support_levels) < 2:
-        support_levels.append(round(price_min + np.random.uniform(0, 0.3) * (price_max - price_min), 2))
+    # Ensure we have at least two levels each, drawing any missing ones in
+    # one call per side
+    support_draws = RNG.uniform(0, 0.3, size=max(0, 2 - len(support_levels)))
+    support_levels.extend(
+        round(price_min + draw * (price_max - price_min), 2) for draw in support_draws.tolist()
+    )
     
-    while len(resistance_levels) < 2:
-        resistance_levels.append(round(price_min + np.random.uniform(0.7, 1.0) * (price_max - price_min), 2))
+    resistance_draws = RNG.uniform(0.7, 1.0, size=max(0, 2 - len(resistance_levels)))
+    resistance_levels.extend(
+        round(price_min + draw * (price_max - price_min), 2) for draw in resistance_draws.tolist()
+    )
     
     # Sort levels (supports low to high, resistance high to low)
     support_levels = sorted(support_levels)
@@ -296,20 +297,23 @@ def detect_horizontal_lines(edge_image):
         threshold=50, minLineLength=edge_image.shape[1] // 5, maxLineGap=20
     )
     
-    horizontal_lines = []
+    if lines is None:
+        return []
+    
+    return _filter_horizontal_lines(lines)
+
+def _filter_horizontal_lines(lines):
+    x1, y1, x2, y2 = lines.reshape(-1, 4).T
     
-    if lines is not None:
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
-            
-            # Check if the line is approximately horizontal
-            if abs(y2 - y1) < 10:  # Allow small deviation
-                # Store the y-coordinate
-                horizontal_lines.append((y1 + y2) // 2)
+    # Keep the approximately horizontal lines (small deviation allowed) and
+    # store their sorted y-coordinates
+    horizontal = np.abs(y2 - y1) < 10
+    horizontal_lines = np.sort((y1[horizontal] + y2[horizontal]) // 2).tolist()
     
-    # Remove duplicates (lines that are very close to each other)
+    # Remove duplicates (lines that are very close to each other); each line
+    # is compared to the last one kept, so this stays a loop over the few
+    # surviving lines
     if horizontal_lines:
-        horizontal_lines = sorted(horizontal_lines)
         filtered_lines = [horizontal_lines[0]]
         
         for line in horizontal_lines[1:]:
@@ -0,0 +1,560 @@
+# Static markup for the Streamlit UI and the function that fills it in for an
+# analysis. Streamlit re-executes app.py on every rerun; module-level
+# constants here are built once per process.
+
+# Palette used by the analysis results cards
+ACCENT_COLOR = "#8b9eff"
+BULLISH_COLOR = "#03DAC6"
+BEARISH_COLOR = "#FF4F5E"
+CAUTION_COLOR = "#FFB740"
+TEXT_COLOR = "#ffffff"
+CARD_BG_COLOR = "#1a2942"
+BORDER_COLOR = "#2d3747"
+
+# Custom CSS for a cleaner, more modern UI
+APP_CSS = """
+<style>
+    /* Global styles */
+    .reportview-container .main .block-container {
+        max-width: 1200px;
+        padding-top: 2rem;
+        padding-bottom: 2rem;
+    }
+    body {
+        background-color: #0a1929;
+        color: #ffffff;
+    }
+    h1, h2, h3, h4, h5, h6 {
+        color: #8b9eff;
+        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    }
+    
+    /* Main header */
+    .main-header {
+        font-size: 3.2rem;
+        font-weight: 700;
+        background: linear-gradient(90deg, #8b9eff, #c49bff);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        text-align: center;
+        margin-bottom: 0.2rem;
+        line-height: 1.2;
+        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    }
+    .sub-header {
+        font-size: 1.2rem;
+        color: #ffffff;
+        opacity: 0.8;
+        text-align: center;
+        margin-bottom: 2rem;
+        font-weight: 400;
+    }
+    .section-header {
+        font-size: 1.5rem;
+        font-weight: 600;
+        margin-top: 2rem;
+        color: #8b9eff;
+        padding-bottom: 0.5rem;
+        border-bottom: 1px solid #2d3747;
+    }
+    
+    /* Cards and containers */
+    .modern-card {
+        background-color: #121f33;
+        border-radius: 20px;
+        padding: 1.5rem;
+        margin-bottom: 1.5rem;
+        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.15);
+        border: 1px solid #2d3747;
+    }
+    .upload-section {
+        border: 2px dashed #6c79ff;
+        border-radius: 20px;
+        padding: 2.5rem;
+        text-align: center;
+        margin: 1rem 0 2rem 0;
+        background-color: rgba(108, 121, 255, 0.05);
+        transition: all 0.3s ease;
+    }
+    .upload-section:hover {
+        background-color: rgba(108, 121, 255, 0.08);
+        transform: translateY(-5px);
+    }
+    
+    /* Button styling */
+    .modern-button {
+        background: linear-gradient(90deg, #6c79ff, #9b5de5);
+        color: white;
+        padding: 0.8rem 2rem;
+        border-radius: 50px;
+        font-weight: 600;
+        border: none;
+        cursor: pointer;
+        text-align: center;
+        transition: all 0.3s;
+        box-shadow: 0 4px 10px rgba(108, 121, 255, 0.3);
+        display: inline-block;
+        margin: 1rem auto;
+        width: auto;
+    }
+    .modern-button:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 7px 15px rgba(108, 121, 255, 0.4);
+    }
+    
+    /* Analysis result styles */
+    .tab-content {
+        padding: 1.5rem;
+        background-color: #121f33;
+        border-radius: 0 0 15px 15px;
+        margin-top: -16px;
+        border: 1px solid #2d3747;
+        border-top: none;
+    }
+    .pattern-card {
+        background-color: #1a2942;
+        padding: 1.2rem;
+        border-radius: 15px;
+        margin-bottom: 1rem;
+        border: 1px solid #2d3747;
+        transition: transform 0.2s;
+    }
+    .pattern-card:hover {
+        transform: translateY(-3px);
+    }
+    .metric-card {
+        background-color: #1a2942;
+        padding: 1.2rem;
+        border-radius: 15px;
+        border: 1px solid #2d3747;
+        transition: transform 0.3s;
+    }
+    .metric-card:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 6px 12px rgba(0, 0, 0, 0.2);
+    }
+    .card-row {
+        display: grid;
+        grid-template-columns: repeat(var(--columns, 3), minmax(0, 1fr));
+        gap: 1rem;
+    }
+    .confidence-bar {
+        height: 8px;
+        background-color: #2d3747;
+        border-radius: 4px;
+        overflow: hidden;
+    }
+    .confidence-bar > div {
+        height: 100%;
+        background: linear-gradient(90deg, #6c79ff, #9b5de5);
+    }
+    
+    /* Indicator badges */
+    .time-badge {
+        background-color: rgba(108, 121, 255, 0.2);
+        color: #8b9eff;
+        padding: 0.3rem 0.8rem;
+        border-radius: 50px;
+        font-weight: 600;
+        font-size: 0.9rem;
+        display: inline-block;
+        margin-left: 1rem;
+    }
+    
+    /* Disclaimer */
+    .disclaimer {
+        background-color: rgba(108, 121, 255, 0.07);
+        padding: 1rem;
+        border-radius: 12px;
+        margin-top: 2rem;
+        text-align: center;
+        font-style: italic;
+        color: #ffffff;
+        opacity: 0.7;
+        border: 1px solid rgba(108, 121, 255, 0.2);
+        font-size: 0.9rem;
+    }
+    
+    /* Footer section */
+    .footer-section {
+        margin-top: 3rem;
+        padding-top: 1.5rem;
+        border-top: 1px solid #2d3747;
+        text-align: center;
+        font-size: 0.9rem;
+        opacity: 0.7;
+    }
+    .how-it-works {
+        display: flex;
+        justify-content: center;
+        margin: 1rem 0;
+        flex-wrap: wrap;
+    }
+    .step-item {
+        display: flex;
+        align-items: center;
+        margin: 0 1rem;
+        padding: 0.5rem 1rem;
+        background-color: rgba(108, 121, 255, 0.07);
+        border-radius: 50px;
+        margin-bottom: 0.5rem;
+    }
+    .step-number {
+        background: linear-gradient(90deg, #6c79ff, #9b5de5);
+        color: white;
+        width: 25px;
+        height: 25px;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        border-radius: 50%;
+        margin-right: 0.8rem;
+        font-weight: bold;
+        font-size: 0.8rem;
+    }
+    
+    /* Streamlit element modifications */
+    .css-1kyxreq {
+        justify-content: center !important;
+    }
+    [data-testid="stSidebar"] {
+        background-color: #0a1929;
+        border-right: 1px solid #2d3747;
+    }
+    [data-testid="stSidebar"] .css-1d391kg {
+        background-color: #121f33;
+    }
+    .stProgress > div > div > div > div {
+        background: linear-gradient(90deg, #6c79ff, #9b5de5);
+    }
+    /* Login / Sign Up tabs */
+    .stTabs [data-baseweb="tab-list"] {
+        gap: 8px;
+    }
+    .stTabs [data-baseweb="tab"] {
+        background-color: #121f33;
+        border-radius: 15px 15px 0 0;
+        border: 1px solid #2d3747;
+        border-bottom: none;
+        color: #ffffff;
+        padding: 10px 20px;
+    }
+    .stTabs [aria-selected="true"] {
+        background: linear-gradient(180deg, #1a2942, #121f33);
+        color: #8b9eff;
+        font-weight: bold;
+    }
+    /* Results section picker, a horizontal radio drawn as tabs */
+    .st-key-results_view [role="radiogroup"] {
+        gap: 8px;
+    }
+    .st-key-results_view label[data-baseweb="radio"] {
+        background-color: #121f33;
+        border-radius: 15px 15px 0 0;
+        border: 1px solid #2d3747;
+        border-bottom: none;
+        color: #ffffff;
+        padding: 10px 20px;
+        margin-right: 0;
+    }
+    .st-key-results_view label[data-baseweb="radio"] > div:first-child {
+        display: none;
+    }
+    .st-key-results_view label[data-baseweb="radio"]:has(input:checked) {
+        background: linear-gradient(180deg, #1a2942, #121f33);
+        color: #8b9eff;
+        font-weight: bold;
+    }
+</style>
+"""
+
+# Sidebar expander texts
+ABOUT_TIMEFRAMES = """
+- **1m/5m/15m/30m**: Short-term trading
+- **1h/4h**: Intraday trading
+- **1D/1W**: Swing/position trading
+
+The AI adjusts its analysis based on the selected timeframe.
+"""
+
+PATTERN_HELP = """
+Detects common patterns like:
+- Head and Shoulders
+- Double Top/Bottom
+- Triangle patterns
+- Trend lines
+"""
+
+INDICATORS_HELP = """
+Analyzes multiple indicators:
+- Moving Averages (SMA, EMA)
+- Oscillators (RSI, MACD, Stochastic)
+- Support/Resistance levels
+"""
+
+# Footer. Each st.markdown call is its own DOM element, so wrapper divs must
+# be part of the same HTML string as their content
+HOW_IT_WORKS_HTML = """
+<div class="footer-section">
+    <h5 style="text-align: center; margin-bottom: 0.5rem;">How it Works</h5>
+    <div class="how-it-works">
+        <div class="step-item"><div class="step-number">1</div>Upload chart</div>
+        <div class="step-item"><div class="step-number">2</div>Select timeframe</div>
+        <div class="step-item"><div class="step-number">3</div>Analyze</div>
+        <div class="step-item"><div class="step-number">4</div>Review patterns</div>
+        <div class="step-item"><div class="step-number">5</div>Get suggestions</div>
+    </div>
+</div>
+"""
+
+DISCLAIMER_HTML = """
+<div class="disclaimer">
+    <strong>Disclaimer:</strong> This is not financial advice. Always do your own research before making any trading decisions.
+    The AI analysis is based on technical indicators and pattern recognition only.
+</div>
+"""
+
+# Confidence buckets indexed by (confidence > 0.5) + (confidence > 0.7)
+CONFIDENCE_COLORS = (BEARISH_COLOR, CAUTION_COLOR, BULLISH_COLOR)
+
+# Risk-reward (color, verdict) indexed by (ratio >= 1) + (ratio >= 2)
+RISK_REWARD_STYLES = (
+    (BEARISH_COLOR, "Poor risk-reward ratio. Consider adjusting your entry, stop loss, or take profit levels."),
+    (CAUTION_COLOR, "Acceptable risk-reward ratio. The potential reward outweighs the risk."),
+    (BULLISH_COLOR, "Excellent risk-reward ratio. The potential reward significantly outweighs the risk.")
+)
+
+# Trend label colors; anything else (e.g. Neutral) falls back to TEXT_COLOR
+TREND_COLORS = {"Bullish": BULLISH_COLOR, "Bearish": BEARISH_COLOR}
+OSCILLATOR_COLORS = {"Overbought": BEARISH_COLOR, "Oversold": BULLISH_COLOR}
+
+# HTML templates for the analysis results, filled per render with format_map.
+# In the f-string templates the palette is substituted once here at import and
+# the doubled braces are the per-render fields.
+TIMEFRAME_BADGE_TEMPLATE = """
+<div style="display: flex; align-items: center; margin-bottom: 1rem;">
+    <h3 style="margin: 0; padding: 0;">Chart Analysis</h3>
+    <div class="time-badge">{timeframe} Timeframe</div>
+</div>
+"""
+
+PATTERN_CARD_TEMPLATE = f"""
+<div class="pattern-card">
+    <h5 style="color: {ACCENT_COLOR};">{{name}}</h5>
+    <p>{{description}}</p>
+    <div style="margin: 0.5rem 0;">
+        <div class="confidence-bar"><div style="width: {{confidence_pct:.0f}}%;"></div></div>
+        <p style="text-align: right; color: {{conf_color}}; font-weight: 500;">
+            Confidence: {{confidence:.2f}}
+        </p>
+    </div>
+</div>
+"""
+
+# No surrounding newlines: cards are joined inside one card-row, and a blank
+# line there would end the HTML block in markdown
+MA_CARD_TEMPLATE = f"""<div style="text-align: center; padding: 0.8rem; border-radius: 12px; border: 1px solid {BORDER_COLOR}; background-color: {CARD_BG_COLOR};">
+    <h5 style="margin: 0; font-size: 1rem;">{{name}}</h5>
+    <p style="font-size: 1.2rem; font-weight: 600; margin: 0.3rem 0;">{{value:.2f}}</p>
+    <p style="margin: 0; color: {{trend_color}};">{{trend}}</p>
+</div>"""
+
+OSCILLATORS_TEMPLATE = f"""
+<div class="card-row" style="--columns: 3;">
+    <div class="metric-card">
+        <h5 style="margin: 0; color: {ACCENT_COLOR};">RSI (14)</h5>
+        <p style="font-size: 1.5rem; font-weight: 600; margin: 0.5rem 0; color: {TEXT_COLOR};">{{rsi_value:.2f}}</p>
+        <p style="margin: 0; color: {{rsi_color}};">{{rsi_trend}}</p>
+    </div>
+    <div class="metric-card">
+        <h5 style="margin: 0; color: {ACCENT_COLOR};">MACD</h5>
+        <p style="font-size: 1.5rem; font-weight: 600; margin: 0.5rem 0; color: {TEXT_COLOR};">{{macd_line:.2f}}</p>
+        <p style="margin: 0; color: {{macd_color}};">{{macd_trend}}</p>
+        <p style="margin: 0; font-size: 0.8rem; opacity: 0.7;">Signal: {{macd_signal:.2f}}</p>
+    </div>
+    <div class="metric-card">
+        <h5 style="margin: 0; color: {ACCENT_COLOR};">Stochastic</h5>
+        <p style="font-size: 1.5rem; font-weight: 600; margin: 0.5rem 0; color: {TEXT_COLOR};">{{stoch_k:.2f}}</p>
+        <p style="margin: 0; color: {{stoch_color}};">{{stoch_trend}}</p>
+    </div>
+</div>
+"""
+
+SUPPORT_RESISTANCE_TEMPLATE = f"""
+<div class="card-row" style="--columns: 2;">
+    <div style="padding: 1rem; border-radius: 12px; border: 1px solid rgba(3, 218, 198, 0.3); background-color: rgba(3, 218, 198, 0.05);">
+        <h5 style="margin: 0; color: {BULLISH_COLOR};">Support Levels</h5>
+        <p style="font-size: 1.2rem; font-weight: 600; margin: 0.5rem 0; color: {TEXT_COLOR};">S1: {{s1}}</p>
+        <p style="font-size: 1.1rem; margin: 0.5rem 0; color: {TEXT_COLOR}; opacity: 0.8;">S2: {{s2}}</p>
+    </div>
+    <div style="padding: 1rem; border-radius: 12px; border: 1px solid rgba(255, 79, 94, 0.3); background-color: rgba(255, 79, 94, 0.05);">
+        <h5 style="margin: 0; color: {BEARISH_COLOR};">Resistance Levels</h5>
+        <p style="font-size: 1.2rem; font-weight: 600; margin: 0.5rem 0; color: {TEXT_COLOR};">R1: {{r1}}</p>
+        <p style="font-size: 1.1rem; margin: 0.5rem 0; color: {TEXT_COLOR}; opacity: 0.8;">R2: {{r2}}</p>
+    </div>
+</div>
+"""
+
+# (keyword in the lowercased action, (color, icon)), checked in order. Actions
+# are the SUGGESTION_ACTIONS of ai_suggestions ("STRONG LONG" ... "STRONG
+# SHORT"); NEUTRAL falls through to the default
+ACTION_STYLES = (
+    ("long", (BULLISH_COLOR, "📈")),
+    ("short", (BEARISH_COLOR, "📉"))
+)
+DEFAULT_ACTION_STYLE = (ACCENT_COLOR, "📊")
+
+SUGGESTION_TEMPLATE = f"""
+<div style="background-color: {{suggestion_color}}; padding: 1.5rem; border-radius: 12px; margin-bottom: 1.5rem;">
+    <div style="display: flex; justify-content: space-between; align-items: center;">
+        <h3 style="color: white; margin: 0; display: flex; align-items: center;">
+            <span style="font-size: 2rem; margin-right: 1rem;">{{icon}}</span>
+            {{action}}
+        </h3>
+        <div style="background-color: rgba(255,255,255,0.2); border-radius: 50px; padding: 0.5rem 1rem; display: flex; align-items: center;">
+            <div style="width: 10px; height: 10px; background-color: white; border-radius: 50%; margin-right: 8px;"></div>
+            <span style="color: white; font-weight: bold;">{{strength}}% Strength</span>
+        </div>
+    </div>
+</div>
+<div style="background-color: {CARD_BG_COLOR}; padding: 1.5rem; border-radius: 12px; box-shadow: 0 2px 6px rgba(0,0,0,0.1); margin-bottom: 1.5rem; border: 1px solid {BORDER_COLOR};">
+    <p style="font-size: 1.1rem; line-height: 1.6; color: {TEXT_COLOR};">{{rationale}}</p>
+</div>
+"""
+
+KEY_LEVELS_TEMPLATE = f"""
+<h4>Key Trading Levels</h4>
+<div class="card-row" style="--columns: 3;">
+    <div class="metric-card" style="border-top: 4px solid {ACCENT_COLOR};">
+        <h5 style="margin: 0; color: {ACCENT_COLOR};">Entry Point</h5>
+        <p style="font-size: 1.5rem; font-weight: 600; margin: 0.5rem 0; color: {TEXT_COLOR};">{{entry_point}}</p>
+    </div>
+    <div class="metric-card" style="border-top: 4px solid {BEARISH_COLOR};">
+        <h5 style="margin: 0; color: {BEARISH_COLOR};">Stop Loss</h5>
+        <p style="font-size: 1.5rem; font-weight: 600; margin: 0.5rem 0; color: {TEXT_COLOR};">{{stop_loss}}</p>
+    </div>
+    <div class="metric-card" style="border-top: 4px solid {BULLISH_COLOR};">
+        <h5 style="margin: 0; color: {BULLISH_COLOR};">Take Profit</h5>
+        <p style="font-size: 1.5rem; font-weight: 600; margin: 0.5rem 0; color: {TEXT_COLOR};">{{take_profit}}</p>
+    </div>
+</div>
+"""
+
+RISK_REWARD_TEMPLATE = f"""
+<div style="margin-top: 1.5rem; background-color: {CARD_BG_COLOR}; padding: 1.2rem; border-radius: 12px; border: 1px solid {BORDER_COLOR};">
+    <div style="display: flex; justify-content: space-between; align-items: center;">
+        <h5 style="margin: 0; color: {ACCENT_COLOR};">Risk-Reward Ratio</h5>
+        <p style="font-size: 1.2rem; font-weight: 600; color: {{rr_color}}; margin: 0;">1:{{risk_reward:.2f}}</p>
+    </div>
+    <div style="height: 6px; background-color: {BORDER_COLOR}; margin-top: 0.8rem; border-radius: 3px;">
+        <div style="height: 100%; width: {{rr_bar_pct}}%; background-color: {{rr_color}}; border-radius: 3px;"></div>
+    </div>
+    <p style="margin: 0.5rem 0 0 0; font-size: 0.9rem; color: {TEXT_COLOR}; opacity: 0.8;">
+        {{rr_verdict}}
+    </p>
+</div>
+"""
+
+def build_results_html(results, timeframe):
+    """
+    Build the HTML for every section of the analysis results
+    
+    Args:
+        results (dict): Patterns, indicators and trading suggestion from the analysis
+        timeframe (str): The timeframe of the chart
+        
+    Returns:
+        dict: HTML per section; "patterns" is None when nothing was detected
+    """
+    html = {"badge": TIMEFRAME_BADGE_TEMPLATE.format_map({"timeframe": timeframe})}
+    
+    # All pattern cards go out as one HTML block; the confidence bar is
+    # plain CSS so no st.progress element is needed per pattern
+    pattern_cards = []
+    for pattern in results["patterns"]:
+        confidence = pattern['confidence']
+        
+        # Color coding for confidence
+        conf_color = CONFIDENCE_COLORS[(confidence > 0.5) + (confidence > 0.7)]
+        
+        pattern_cards.append(PATTERN_CARD_TEMPLATE.format_map({
+            "name": pattern['name'],
+            "description": pattern['description'],
+            "confidence": confidence,
+            "confidence_pct": confidence * 100,
+            "conf_color": conf_color
+        }))
+    html["patterns"] = "".join(pattern_cards) if pattern_cards else None
+    
+    indicators = results["indicators"]
+    oscillators = indicators['oscillators']
+    rsi, macd, stoch = oscillators['rsi'], oscillators['macd'], oscillators['stochastic']
+    support_resistance = indicators['support_resistance']
+    
+    # Create a cleaner display for moving averages
+    moving_averages = indicators['moving_averages']
+    ma_cards = []
+    # technical_indicators.MA_KEYS fixes the order; "sma_20" is shown as "SMA 20"
+    for ma_key, ma in moving_averages.items():
+        ma_name = ma_key.upper().replace("_", " ")
+        ma_trend = ma['trend']
+        trend_color = TREND_COLORS.get(ma_trend, TEXT_COLOR)
+        ma_cards.append(MA_CARD_TEMPLATE.format_map({
+            "name": ma_name,
+            "value": ma['value'],
+            "trend": ma_trend,
+            "trend_color": trend_color
+        }))
+    
+    # No blank lines inside the row, so markdown keeps it a single HTML block
+    html["moving_averages"] = f"<div class='card-row' style='--columns: 5;'>{''.join(ma_cards)}</div>"
+    
+    # RSI, MACD and Stochastic cards in one row
+    rsi_color = OSCILLATOR_COLORS.get(rsi['trend'], TEXT_COLOR)
+    macd_color = TREND_COLORS.get(macd['trend'], TEXT_COLOR)
+    stoch_color = OSCILLATOR_COLORS.get(stoch['trend'], TEXT_COLOR)
+    html["oscillators"] = OSCILLATORS_TEMPLATE.format_map({
+        "rsi_value": rsi['value'],
+        "rsi_trend": rsi['trend'],
+        "rsi_color": rsi_color,
+        "macd_line": macd['line'],
+        "macd_signal": macd['signal'],
+        "macd_trend": macd['trend'],
+        "macd_color": macd_color,
+        "stoch_k": stoch['k'],
+        "stoch_trend": stoch['trend'],
+        "stoch_color": stoch_color
+    })
+    
+    # Support and resistance cards side by side
+    html["support_resistance"] = SUPPORT_RESISTANCE_TEMPLATE.format_map({
+        "s1": support_resistance['support'][0],
+        "s2": support_resistance['support'][1],
+        "r1": support_resistance['resistance'][0],
+        "r2": support_resistance['resistance'][1]
+    })
+    
+    trading_suggestion = results["trading_suggestion"]
+    
+    # Determine color and icon based on action; the first matching keyword wins
+    action = trading_suggestion["action"].lower()
+    suggestion_color, icon = next(
+        (style for keyword, style in ACTION_STYLES if keyword in action), DEFAULT_ACTION_STYLE
+    )
+    
+    # Suggestion with strength meter
+    html["suggestion"] = SUGGESTION_TEMPLATE.format_map({
+        "suggestion_color": suggestion_color,
+        "icon": icon,
+        "action": trading_suggestion['action'],
+        # Get strength value if available, or default to 75
+        "strength": trading_suggestion.get('strength', 75),
+        "rationale": trading_suggestion['rationale']
+    })
+    
+    html["key_levels"] = KEY_LEVELS_TEMPLATE.format_map(trading_suggestion)
+    
+    # Risk-reward fields are added with the analysis, by _add_risk_reward in app.py
+    html["risk_reward"] = RISK_REWARD_TEMPLATE.format_map(trading_suggestion)
+    
+    return html